@@ -0,0 +1,118 @@
+"""
+Benchmarks every Maze.solve strategy on a corpus of generated mazes.
+
+Mazes are generated into the corpus directory on first use and reused
+after that. Each strategy is timed on each maze and its peak memory
+recorded, in a CSV row per solve. A strategy is dropped from larger
+mazes once a single solve takes longer than the budget.
+
+Usage: python benchmark.py [--generators backtracker prims open]
+                           [--sizes 101 301] [--strategies dfs jps]
+                           [--density D] [--budget SECONDS]
+                           [--corpus DIR] [--output FILE.csv]
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+from generate import generate
+from maze import STRATEGIES, Maze
+
+FIELDS = ["generator", "size", "density", "strategy", "solved", "length",
+          "explored", "seconds", "peak_bytes"]
+
+
+def corpus_maze(corpus, generator, size, density):
+    """Returns the path of a size by size maze, generating it if needed."""
+    name = f"{generator}_{size}"
+    if generator == "open":
+        name += f"_{density}"
+    path = os.path.join(corpus, f"{name}.txt")
+    if not os.path.exists(path):
+        os.makedirs(corpus, exist_ok=True)
+        with open(path, "wb") as f:
+            generate(generator, size, size, f, density)
+    return path
+
+
+def solve(maze, strategy):
+    """Solves maze with strategy, returning False if it has no solution."""
+    try:
+        maze.solve(strategy)
+    except Exception as e:
+        if str(e) != "no solution":
+            raise
+        return False
+    return True
+
+
+def peak_memory(maze, strategy):
+    """
+    Returns the most bytes allocated at once while solving maze. Tracing
+    slows every allocation down, so this is a separate, untimed solve.
+    """
+    tracemalloc.start()
+    solve(maze, strategy)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(generators, sizes, strategies, density, budget, corpus, f):
+    """
+    Writes one CSV row to f per generator, size and strategy, as soon as it
+    is measured, so a long run that is stopped still leaves its results.
+    """
+    writer = csv.writer(f)
+    writer.writerow(FIELDS)
+    for generator in generators:
+        active = list(strategies)
+        for size in sizes:
+            maze = Maze(corpus_maze(corpus, generator, size, density))
+            for strategy in list(active):
+                start = time.perf_counter()
+                solved = solve(maze, strategy)
+                seconds = time.perf_counter() - start
+                writer.writerow([
+                    generator, size, density if generator == "open" else "",
+                    strategy, solved,
+                    len(maze.solution[0]) if solved else "",
+                    maze.num_explored, f"{seconds:.6f}",
+                    peak_memory(maze, strategy)
+                ])
+                f.flush()
+                print(f"{generator} {size} {strategy}: {seconds:.3f}s",
+                      file=sys.stderr)
+
+                # Larger mazes would only take longer
+                if seconds > budget:
+                    active.remove(strategy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--generators", nargs="+",
+                        default=["backtracker", "prims", "open"],
+                        choices=["backtracker", "prims", "open"])
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=[51, 101, 201, 501, 1001])
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES,
+                        choices=STRATEGIES)
+    parser.add_argument("--density", type=float, default=0.25,
+                        help="share of walls in open fields")
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="seconds per solve before a strategy stops")
+    parser.add_argument("--corpus", default="corpus")
+    parser.add_argument("--output", default="benchmark.csv")
+    args = parser.parse_args()
+    with open(args.output, "w", newline="") as f:
+        run(args.generators, sorted(args.sizes), args.strategies,
+            args.density, args.budget, args.corpus, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Generates maze files that maze.py can solve.
+
+Mazes are written a row at a time, so files of any size can be produced.
+The open generator holds a single row in memory; the backtracker and
+prims generators, which make perfect mazes with exactly one path between
+any two cells, hold one byte per cell.
+
+Usage: python generate.py backtracker|prims|open HEIGHT WIDTH FILE
+                          [--density D] [--seed N]
+"""
+
+import argparse
+import random
+
+WALL = ord("#")
+OPEN = ord(" ")
+
+
+def generate(algorithm, height, width, f, density=0.25, seed=0):
+    """Writes a maze made by algorithm to the binary file f."""
+    rng = random.Random(seed)
+    if algorithm == "open":
+        rows = open_field(height, width, density, rng)
+    else:
+        if algorithm == "backtracker":
+            carve = backtracker
+        elif algorithm == "prims":
+            carve = prims
+        else:
+            raise Exception(f"unknown algorithm {algorithm}")
+        rows = perfect(height, width, carve, rng)
+    f.writelines(row + b"\n" for row in rows)
+
+
+def open_field(height, width, density, rng):
+    """
+    Yields rows of an open field where each cell is a wall with
+    probability density, with the start and goal in opposite corners.
+    """
+    if height * width < 2:
+        raise Exception("maze must have room for a start and a goal")
+    for i in range(height):
+        row = bytearray(
+            WALL if rng.random() < density else OPEN for _ in range(width)
+        )
+        if i == 0:
+            row[0] = ord("A")
+        if i == height - 1:
+            row[-1] = ord("B")
+        yield bytes(row)
+
+
+def perfect(height, width, carve, rng):
+    """
+    Yields rows of a perfect maze, with cells at odd coordinates joined
+    through the walls between them by carve.
+    """
+    rows, cols = (height - 1) // 2, (width - 1) // 2
+    if rows < 1 or cols < 1 or rows * cols < 2:
+        raise Exception("maze must have room for a start and a goal")
+    grid = bytearray([WALL]) * (height * width)
+
+    def index(r, c):
+        """Returns the grid position of cell (r, c)."""
+        return (2 * r + 1) * width + 2 * c + 1
+
+    carve(rows, cols, grid, index, rng)
+    grid[index(0, 0)] = ord("A")
+    grid[index(rows - 1, cols - 1)] = ord("B")
+    for i in range(height):
+        yield bytes(grid[i * width:(i + 1) * width])
+
+
+def neighbors(r, c, rows, cols):
+    """Returns the cells next to (r, c) within a rows by cols maze."""
+    result = []
+    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        if 0 <= r + dr < rows and 0 <= c + dc < cols:
+            result.append((r + dr, c + dc))
+    return result
+
+
+def join(grid, index, a, b):
+    """Opens cells a and b and the wall between them."""
+    i, j = index(*a), index(*b)
+    grid[i] = grid[j] = grid[(i + j) // 2] = OPEN
+
+
+def backtracker(rows, cols, grid, index, rng):
+    """Carves a maze by a random depth-first walk, backing up at dead ends."""
+    grid[index(0, 0)] = OPEN
+    stack = [(0, 0)]
+    while stack:
+        cell = stack[-1]
+        unvisited = [
+            neighbor for neighbor in neighbors(*cell, rows, cols)
+            if grid[index(*neighbor)] == WALL
+        ]
+        if not unvisited:
+            stack.pop()
+            continue
+        neighbor = rng.choice(unvisited)
+        join(grid, index, cell, neighbor)
+        stack.append(neighbor)
+
+
+def prims(rows, cols, grid, index, rng):
+    """
+    Carves a maze by randomized Prim's algorithm: repeatedly joins a random
+    cell bordering the maze to a random cell already in it.
+    """
+    grid[index(0, 0)] = OPEN
+    frontier = neighbors(0, 0, rows, cols)
+    queued = set(frontier)
+    while frontier:
+
+        # Take a random frontier cell in O(1) by swapping it to the end
+        k = rng.randrange(len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        cell = frontier.pop()
+
+        inside = []
+        for neighbor in neighbors(*cell, rows, cols):
+            if grid[index(*neighbor)] == OPEN:
+                inside.append(neighbor)
+            elif neighbor not in queued:
+                queued.add(neighbor)
+                frontier.append(neighbor)
+        join(grid, index, cell, rng.choice(inside))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("algorithm", choices=["backtracker", "prims", "open"])
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("file")
+    parser.add_argument("--density", type=float, default=0.25,
+                        help="share of walls in an open field")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.file, "wb") as f:
+        generate(args.algorithm, args.height, args.width, f,
+                 args.density, args.seed)
+
+
+if __name__ == "__main__":
+    main()
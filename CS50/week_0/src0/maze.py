@@ -1,21 +1,46 @@
+import collections
+import heapq
+import itertools
+import numpy as np
+import os
 import sys
+import time
+
+# Bytes scanned at a time when searching a mapped maze file
+BLOCK = 1 << 24
+
+# Longest side in pixels of the image drawn from the command line
+IMAGE_SIDE = 2000
+
+STRATEGIES = ["dfs", "bfs", "greedy", "astar", "ucs", "wavefront",
+              "bidirectional", "jps"]
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = collections.deque()
+
+        # How many times each state is in the frontier, for O(1) lookups
+        self.states = collections.Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
+
+    def improves(self, state, cost):
+        """Whether a path of cost should replace the one to state."""
+        return False
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,9 +49,14 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            return self.forget(self.frontier.pop())
+
+    def forget(self, node):
+        """Drops a node just taken off the frontier from the state counts."""
+        self.states[node.state] -= 1
+        if self.states[node.state] == 0:
+            del self.states[node.state]
+        return node
 
 
 class QueueFrontier(StackFrontier):
@@ -35,48 +65,115 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            return self.forget(self.frontier.popleft())
+
+
+class PriorityFrontier():
+    """
+    Removes the node with the lowest priority(state, cost), a tuple,
+    breaking remaining ties by the order nodes were added.
+    """
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.frontier = []
+        self.counter = itertools.count()
+
+        # Heap entry of the best node in the frontier for each state; older
+        # entries for the same state are skipped when they come off the heap
+        self.nodes = {}
+
+    def add(self, node):
+        entry = (self.priority(node.state, node.cost), next(self.counter), node)
+        self.nodes[node.state] = entry
+        heapq.heappush(self.frontier, entry)
+
+    def contains_state(self, state):
+        return state in self.nodes
+
+    def improves(self, state, cost):
+        """Whether a path of cost has a lower priority than the one to state."""
+        return self.priority(state, cost) < self.nodes[state][0]
+
+    def empty(self):
+        return len(self.nodes) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            entry = heapq.heappop(self.frontier)
+            node = entry[2]
+            if self.nodes.get(node.state) is entry:
+                del self.nodes[node.state]
+                return node
+
+def find(contents, character):
+    """Returns the positions of character in an array of bytes."""
+    return np.concatenate([np.zeros(0, dtype=np.intp)] + [
+        start + np.flatnonzero(contents[start:start + BLOCK] == ord(character))
+        for start in range(0, len(contents), BLOCK)
+    ])
+
 
 class Maze():
 
     def __init__(self, filename):
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+        # Map the file rather than reading it, so huge mazes are never held
+        # in memory as text
+        if os.path.getsize(filename) == 0:
+            contents = np.zeros(0, dtype=np.uint8)
+        else:
+            contents = np.memmap(filename, dtype=np.uint8, mode="r")
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        starts = find(contents, "A")
+        goals = find(contents, "B")
+        if len(starts) != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if len(goals) != 1:
             raise Exception("maze must have exactly one goal")
 
+        # Find where each line begins and ends, without its line break
+        ends = find(contents, "\n")
+        if len(ends) == 0 or ends[-1] != len(contents) - 1:
+            ends = np.append(ends, len(contents))
+        lines = np.concatenate([[0], ends[:-1] + 1])
+        returns = (ends > lines) & (contents[np.maximum(ends - 1, 0)] == ord("\r"))
+        ends = ends - returns
+
         # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
+        self.height = len(lines)
+        self.width = int((ends - lines).max())
 
-        # Keep track of walls
-        self.walls = []
+        # Keep track of walls; short lines are padded with empty cells
+        self.walls = np.zeros((self.height, self.width), dtype=bool)
         for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+            line = contents[lines[i]:ends[i]]
+            self.walls[i, :len(line)] = (
+                (line != ord(" ")) & (line != ord("A")) & (line != ord("B"))
+            )
+        for name, (position,) in [("start", starts), ("goal", goals)]:
+            i = int(np.searchsorted(lines, position, side="right")) - 1
+            setattr(self, name, (i, int(position - lines[i])))
+
+        # Flat-index graph: cells numbered row by row inside a border of
+        # walls, so each neighbor is a fixed offset that is never out of bounds
+        self.stride = self.width + 2
+        passable = np.zeros((self.height + 2, self.stride), dtype=bool)
+        passable[1:-1, 1:-1] = ~self.walls
+        self.passable = passable.ravel()
+        self.lookup = memoryview(self.passable)
+        self.moves = [
+            ("up", -self.stride, (-1, 0)),
+            ("down", self.stride, (1, 0)),
+            ("left", -1, (0, -1)),
+            ("right", 1, (0, 1))
+        ]
+
+        # Optional PathIndex of the maze, used to answer solve faster
+        self.path_index = None
 
         self.solution = None
 
@@ -100,31 +197,86 @@ class Maze():
         print()
 
 
+    def index(self, state):
+        """Returns the flat index of a cell."""
+        return (state[0] + 1) * self.stride + state[1] + 1
+
+
+    def state(self, index):
+        """Returns the cell with a flat index."""
+        row, col = divmod(index, self.stride)
+        return (row - 1, col - 1)
+
+
     def neighbors(self, state):
         row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
-
+        i = (row + 1) * self.stride + col + 1
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        for action, offset, (dr, dc) in self.moves:
+            if self.lookup[i + offset]:
+                result.append((action, (row + dr, col + dc)))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def heuristic(self, state):
+        """
+        Manhattan distance from state to the goal, or the index's landmark
+        bound if that is larger.
+        """
+        distance = abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+        if self.path_index is not None:
+            distance = max(distance, self.path_index.bound(state, self.goal))
+        return distance
+
+
+    def frontier(self, strategy):
+        """Returns an empty frontier that searches using strategy."""
+        if strategy == "dfs":
+            return StackFrontier()
+        elif strategy == "bfs":
+            return QueueFrontier()
+        elif strategy == "greedy":
+            return PriorityFrontier(
+                lambda state, cost: (self.heuristic(state),)
+            )
+        elif strategy == "astar":
+
+            # Among equal estimates, prefer nodes closer to the goal
+            def priority(state, cost):
+                distance = self.heuristic(state)
+                return (cost + distance, distance)
+            return PriorityFrontier(priority)
+        elif strategy == "ucs":
+            return PriorityFrontier(lambda state, cost: (cost,))
+        else:
+            raise Exception(f"unknown strategy {strategy}")
+
+
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists, using strategy: "dfs",
+        "bfs", "greedy" (greedy best-first), "astar", "ucs" (uniform
+        cost), "wavefront" (breadth-first with array operations),
+        "bidirectional" (breadth-first from both ends) or "jps" (A* over
+        jump points). All but dfs and greedy find shortest paths.
+        """
+        if self.path_index is not None and not self.path_index.connected(self.start, self.goal):
+            self.num_explored = 0
+            self.explored = set()
+            raise Exception("no solution")
+        if strategy == "wavefront":
+            return self.solve_wavefront()
+        if strategy == "bidirectional":
+            return self.solve_bidirectional()
 
         # Keep track of number of states explored
         self.num_explored = 0
 
-        # Initialize frontier to just the starting position
+        # Initialize frontier to just the starting position; jump point
+        # search is A* that only stops at cells where a path may turn
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        jps = strategy == "jps"
+        frontier = self.frontier("astar" if jps else strategy)
         frontier.add(start)
 
         # Initialize an empty explored set
@@ -143,87 +295,254 @@ class Maze():
 
             # If node is the goal, then we have a solution
             if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+                self.solution = self.path(node)
                 return
 
             # Mark node as explored
             self.explored.add(node.state)
 
-            # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
+            # Add neighbors to frontier, or a cheaper path to one already there
+            successors = self.jumps(node) if jps else self.neighbors(node.state)
+            for action, state in successors:
+                if state in self.explored:
+                    continue
+                cost = (node.cost + abs(state[0] - node.state[0])
+                        + abs(state[1] - node.state[1]))
+                if not frontier.contains_state(state) or frontier.improves(state, cost):
+                    child = Node(state=state, parent=node, action=action, cost=cost)
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
+    def path(self, node):
+        """
+        Returns the actions and cells leading from the start to node,
+        walking straight along each node's action from its parent.
+        """
+        steps = {action: step for action, _, step in self.moves}
+        actions = []
+        cells = []
+        while node.parent is not None:
+            dr, dc = steps[node.action]
+            state = node.state
+            while state != node.parent.state:
+                actions.append(node.action)
+                cells.append(state)
+                state = (state[0] - dr, state[1] - dc)
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+
+    def jumps(self, node):
+        """
+        Returns (action, state) for each jump point reachable in a straight
+        line from node. Paths turn vertical as early as they can, so moving
+        sideways only needs to stop where a wall beside the path ends, and
+        moving up or down where a sideways jump would find something.
+        """
+        if node.action is None:
+            actions = [action for action, _, _ in self.moves]
+        elif node.action in ["left", "right"]:
+            actions = [node.action, "up", "down"]
+        else:
+            actions = [node.action, "left", "right"]
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+        offsets = {action: offset for action, offset, _ in self.moves}
+        result = []
+        goal = self.index(self.goal)
+        for action in actions:
+            i = self.jump(self.index(node.state), offsets[action], goal)
+            if i is not None:
+                result.append((action, self.state(i)))
+        return result
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+    def jump(self, i, offset, goal):
+        """
+        Returns the flat index of the first jump point moving from i by
+        offset, or None if a wall comes first.
+        """
+        lookup = self.lookup
+        sideways = offset in [-1, 1]
+        side = self.stride if sideways else 1
+        while True:
+            i += offset
+            if not lookup[i]:
+                return None
+            if i == goal:
+                return i
+            if sideways:
+                if ((lookup[i - side] and not lookup[i - offset - side])
+                        or (lookup[i + side] and not lookup[i - offset + side])):
+                    return i
+            elif (self.jump(i, -1, goal) is not None
+                    or self.jump(i, 1, goal) is not None):
+                return i
+
+
+    def solve_bidirectional(self):
+        """
+        Breadth-first search from the start and the goal at once, growing
+        the smaller side one layer at a time until the two meet.
+        """
+        self.num_explored = 0
+        self.explored = set()
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+        # Nodes reached from each end, and each end's newest layer
+        forward = {self.start: Node(state=self.start, parent=None, action=None)}
+        backward = {self.goal: Node(state=self.goal, parent=None, action=None)}
+        layers = [[forward[self.start]], [backward[self.goal]]]
+
+        while layers[0] and layers[1]:
+            side = 0 if len(layers[0]) <= len(layers[1]) else 1
+            reached, other = (forward, backward) if side == 0 else (backward, forward)
+
+            # Expand the whole layer, keeping the shortest meeting found
+            layer = []
+            meeting = None
+            for node in layers[side]:
+                self.num_explored += 1
+                self.explored.add(node.state)
+                for action, state in self.neighbors(node.state):
+                    if state in reached:
+                        continue
+                    child = Node(state=state, parent=node, action=action,
+                                 cost=node.cost + 1)
+                    reached[state] = child
+                    layer.append(child)
+                    if state in other and (
+                        meeting is None
+                        or child.cost + other[state].cost
+                        < meeting.cost + other[meeting.state].cost
+                    ):
+                        meeting = child
+            layers[side] = layer
+
+            # Continue the forward path along the backward one to the goal
+            if meeting is not None:
+                node = forward[meeting.state]
+                back = backward[meeting.state]
+                while back.parent is not None:
+                    node = Node(state=back.parent.state, parent=node,
+                                action=OPPOSITE[back.action], cost=node.cost + 1)
+                    back = back.parent
+                self.solution = self.path(node)
+                return
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+        raise Exception("no solution")
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+    def solve_wavefront(self):
+        """
+        Breadth-first search that expands the whole frontier at once with
+        array operations, recording each cell's parent in a flat array.
+        """
+        start, goal = self.index(self.start), self.index(self.goal)
+        offsets = np.array([offset for _, offset, _ in self.moves])
+        parent = np.full(len(self.passable), -1, dtype=np.intp)
+        parent[start] = start
+        frontier = np.array([start])
+        self.num_explored = 0
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+        # Expand one distance from the start at a time until goal is reached
+        while parent[goal] == -1:
+            if len(frontier) == 0:
+                raise Exception("no solution")
+            self.num_explored += len(frontier)
+            children = (frontier[:, None] + offsets).ravel()
+            parents = np.repeat(frontier, len(offsets))
+            new = self.passable[children] & (parent[children] == -1)
+            children, first = np.unique(children[new], return_index=True)
+            parent[children] = parents[new][first]
+            frontier = children
+        self.num_explored += 1
+
+        # Every reached cell except the last wavefront has been expanded
+        reached = parent != -1
+        reached[frontier] = False
+        rows, cols = np.divmod(np.flatnonzero(reached), self.stride)
+        self.explored = set(zip((rows - 1).tolist(), (cols - 1).tolist()))
+
+        # Follow parents back from the goal
+        directions = {offset: action for action, offset, _ in self.moves}
+        actions = []
+        cells = []
+        i = goal
+        while i != start:
+            actions.append(directions[i - parent[i]])
+            cells.append(self.state(i))
+            i = int(parent[i])
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        from PIL import Image
+
+        # Colour of each kind of cell, plus black for the borders between them
+        EMPTY, WALL, START, GOAL, SOLUTION, EXPLORED, BORDER = range(7)
+        palette = [
+            (237, 240, 252), (40, 40, 40), (255, 0, 0), (0, 171, 28),
+            (220, 235, 113), (212, 97, 85), (0, 0, 0)
+        ]
 
+        # Pick one colour per cell, later kinds drawing over earlier ones
+        cells = np.full((self.height, self.width), EMPTY, dtype=np.uint8)
+        if self.solution is not None:
+            if show_explored and self.explored:
+                rows, cols = np.array(list(self.explored)).T
+                cells[rows, cols] = EXPLORED
+            if show_solution and self.solution[1]:
+                rows, cols = np.array(self.solution[1]).T
+                cells[rows, cols] = SOLUTION
+        cells[self.goal] = GOAL
+        cells[self.start] = START
+        cells[self.walls] = WALL
+
+        # Blow each cell up to a square of pixels inside a black border
+        inside = np.arange(cell_size)
+        inside = (inside >= cell_border) & (inside <= cell_size - cell_border)
+        pixels = np.where(
+            inside[None, :, None, None] & inside[None, None, None, :],
+            cells[:, None, :, None],
+            BORDER
+        ).reshape(self.height * cell_size, self.width * cell_size)
+
+        img = Image.fromarray(pixels, "L")
+        img.putpalette([value for colour in palette for value in colour])
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+if __name__ == "__main__":
+    if len(sys.argv) not in [2, 3]:
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(STRATEGIES)}|compare]")
+
+    m = Maze(sys.argv[1])
+
+    # Time every strategy on the maze instead of solving it once
+    if sys.argv[2:] == ["compare"]:
+        print(f"{'strategy':<15}{'explored':>10}{'length':>8}{'seconds':>10}")
+        for strategy in STRATEGIES:
+            start = time.perf_counter()
+            m.solve(strategy)
+            seconds = time.perf_counter() - start
+            print(f"{strategy:<15}{m.num_explored:>10}"
+                  f"{len(m.solution[0]):>8}{seconds:>10.4f}")
+        sys.exit()
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(*sys.argv[2:])
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+
+    # Shrink the cells of large mazes, dropping the borders of cells too
+    # small to show them
+    cell_size = max(1, min(50, IMAGE_SIDE // max(m.height, m.width)))
+    m.output_image("maze.png", show_explored=True, cell_size=cell_size,
+                   cell_border=2 if cell_size >= 10 else 0)
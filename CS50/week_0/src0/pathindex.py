@@ -0,0 +1,217 @@
+"""
+Index of a maze for answering many start and goal queries on it.
+
+The index records the connected component of every cell, so reachability
+is a lookup, and breadth-first distances from a few landmark cells. With
+the triangle inequality these give A* a lower bound on the distance left
+that is much tighter than Manhattan distance (ALT search). The index is
+built once and saved beside the maze file as maze.txt.index.npz.
+
+Usage: python pathindex.py maze.txt [strategy]
+       then one query per line on stdin: start_row start_col goal_row goal_col
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+
+from maze import Maze
+
+
+class PathIndex():
+    """
+    Components and landmark distances of a maze. Attached to the maze by
+    query, so that its solve strategies can use them.
+    """
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.offsets = np.array([offset for _, offset, _ in maze.moves])
+        self.fingerprint = fingerprint(maze)
+        self.components = None
+        self.landmarks = []
+        self.distances = []
+        self.views = []
+
+        # Landmark distances of the goal of the last bound asked for
+        self.target = None
+        self.target_distances = []
+
+    @classmethod
+    def open(cls, maze, filename, landmarks=8):
+        """
+        Returns the index saved beside the maze file filename, building and
+        saving it first if it is missing or belongs to a different maze.
+        """
+        index = cls(maze)
+        path = filename + ".index.npz"
+        if not index.load(path):
+            index.build(landmarks)
+            index.save(path)
+        return index
+
+    def build(self, landmarks=8):
+        """Labels components and measures distances from the landmarks."""
+        passable = self.maze.passable
+
+        # Label each component with a breadth-first flood from its first cell
+        self.components = np.full(len(passable), -1, dtype=np.int32)
+        labels = memoryview(self.components)
+        sizes = []
+        for i in np.flatnonzero(passable):
+            if labels[i] == -1:
+                sizes.append(self.flood(i, len(sizes)))
+
+        # Spread landmarks over the largest component, each as far as
+        # possible from those already chosen
+        self.landmarks = []
+        self.distances = []
+        if sizes:
+            largest = np.flatnonzero(self.components == np.argmax(sizes))
+            nearest = self.distances_from(largest[0])
+            for _ in range(min(landmarks, len(largest))):
+                landmark = int(np.argmax(nearest))
+                self.landmarks.append(landmark)
+                self.distances.append(self.distances_from(landmark))
+                nearest = np.minimum(nearest, self.distances[-1])
+        self.views = [memoryview(d) for d in self.distances]
+        self.target = None
+
+    def load(self, path):
+        """Reads the index from path, returning whether it was there."""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as saved:
+            if saved["fingerprint"].tobytes() != self.fingerprint:
+                return False
+            self.components = saved["components"]
+            self.landmarks = saved["landmarks"].tolist()
+            self.distances = list(saved["distances"])
+        self.views = [memoryview(d) for d in self.distances]
+        self.target = None
+        return True
+
+    def save(self, path):
+        """Writes the index to path."""
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                fingerprint=np.frombuffer(self.fingerprint, dtype=np.uint8),
+                components=self.components,
+                landmarks=np.array(self.landmarks, dtype=np.intp),
+                distances=np.array(
+                    self.distances, dtype=np.int32
+                ).reshape(len(self.distances), len(self.components))
+            )
+
+    def flood(self, source, label):
+        """Labels every cell connected to source, returning how many."""
+        self.components[source] = label
+        frontier = np.array([source])
+        size = 0
+        while len(frontier):
+            size += len(frontier)
+            children = np.unique((frontier[:, None] + self.offsets).ravel())
+            children = children[self.maze.passable[children]
+                                & (self.components[children] == -1)]
+            self.components[children] = label
+            frontier = children
+        return size
+
+    def distances_from(self, source):
+        """Returns the distance of every cell from source, or -1."""
+        distances = np.full(len(self.maze.passable), -1, dtype=np.int32)
+        distances[source] = 0
+        frontier = np.array([source])
+        distance = 0
+        while len(frontier):
+            distance += 1
+            children = np.unique((frontier[:, None] + self.offsets).ravel())
+            children = children[self.maze.passable[children]
+                                & (distances[children] == -1)]
+            distances[children] = distance
+            frontier = children
+        return distances
+
+    def cell(self, state):
+        """Returns the flat index of a cell, which must be inside the maze."""
+        row, col = state
+        if not (0 <= row < self.maze.height and 0 <= col < self.maze.width):
+            raise Exception(f"cell {state} is outside the maze")
+        return self.maze.index(state)
+
+    def connected(self, a, b):
+        """Whether there is a path between cells a and b."""
+        i, j = self.cell(a), self.cell(b)
+        return self.components[i] != -1 and self.components[i] == self.components[j]
+
+    def bound(self, a, b):
+        """
+        Returns a lower bound on the distance between connected cells a
+        and b: no landmark can be nearer to one than the other by more.
+        A* asks this for every cell it meets, always with the same b.
+        """
+        if b != self.target:
+            j = self.maze.index(b)
+            self.target = b
+            self.target_distances = [(d, d[j]) for d in self.views]
+        i = self.maze.index(a)
+        best = 0
+        for distances, target in self.target_distances:
+            difference = distances[i] - target
+            if difference < 0:
+                difference = -difference
+            if difference > best:
+                best = difference
+        return best
+
+    def query(self, start, goal, strategy="astar"):
+        """Solves the maze from start to goal, returning its solution."""
+
+        # Check both cells first, so a bad query leaves the maze as it was
+        self.cell(start)
+        self.cell(goal)
+        maze = self.maze
+        maze.start, maze.goal, maze.path_index = start, goal, self
+        maze.solve(strategy)
+        return maze.solution
+
+
+def fingerprint(maze):
+    """Returns a digest identifying the layout of maze."""
+    digest = hashlib.sha1(maze.passable.tobytes())
+    digest.update(f"{maze.height}x{maze.width}".encode())
+    return digest.digest()
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python pathindex.py maze.txt [strategy]")
+    strategy = sys.argv[2] if len(sys.argv) == 3 else "astar"
+
+    maze = Maze(sys.argv[1])
+    start = time.perf_counter()
+    index = PathIndex.open(maze, sys.argv[1])
+    print(f"Index ready in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        r1, c1, r2, c2 = map(int, line.split())
+        start = time.perf_counter()
+        try:
+            actions, _ = index.query((r1, c1), (r2, c2), strategy)
+            length = len(actions)
+        except Exception as e:
+            if str(e) != "no solution":
+                raise
+            length = "unreachable"
+        print(f"{r1} {c1} {r2} {c2}: {length}, explored {maze.num_explored}, "
+              f"{time.perf_counter() - start:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
+import collections
 import pygame
 import sys
+import threading
 import time
 
 import tictactoe as ttt
 
+
+def think(board, answer):
+    """
+    Appends the AI's move on board to answer. Runs on a thread of its own,
+    so that frames keep drawing while the AI thinks.
+    """
+    answer.append(ttt.minimax(board))
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -16,10 +27,17 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
 
 user = None
 board = ttt.initial_state()
 ai_turn = False
+ai_answer = []
+ai_ready = 0
+
+# Milliseconds taken by recent frames
+clock = pygame.time.Clock()
+frame_times = collections.deque(maxlen=60)
 
 while True:
 
@@ -27,8 +45,16 @@ while True:
         if event.type == pygame.QUIT:
             sys.exit()
 
+    frame_times.append(clock.tick(60))
     screen.fill(black)
 
+    # Show frame times
+    frame = smallFont.render(
+        f"frame {frame_times[-1]} ms, worst {max(frame_times)} ms",
+        True, white
+    )
+    screen.blit(frame, (10, height - 24))
+
     # Let user choose a player.
     if user is None:
 
@@ -108,15 +134,17 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, worked out in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
+            if not ai_turn:
                 ai_turn = True
+                ai_ready = time.time() + 0.5
+                ai_answer = []
+                threading.Thread(target=think, args=(board, ai_answer),
+                                 daemon=True).start()
+            if ai_answer and time.time() >= ai_ready:
+                board = ttt.result(board, ai_answer[0])
+                ai_turn = False
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +169,10 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
+
+                    # A search left over from the last game runs on to the
+                    # end, but answers into a list no longer looked at
                     ai_turn = False
+                    ai_answer = []
 
     pygame.display.flip()
@@ -1,14 +1,53 @@
 """
 Tic Tac Toe Player
+
+Run this file to rebuild the opening book of perfect moves: python tictactoe.py
 """
 
-import math
-from copy import deepcopy
+import os
+import time
 
 X = "X"
 O = "O"
 EMPTY = None
-optimal_action = None
+
+# Bitboards: each player's squares are a 9-bit mask, square (i, j) is bit 3i + j
+FULL = 0b111111111
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # cols
+    0b100010001, 0b001010100                # diags
+]
+
+# The 8 rotations and reflections of the board, as the square each maps to
+SYMMETRIES = [
+    [3 * i + j for i in range(3) for j in range(3)],
+    [3 * j + (2 - i) for i in range(3) for j in range(3)],
+    [3 * (2 - i) + (2 - j) for i in range(3) for j in range(3)],
+    [3 * (2 - j) + i for i in range(3) for j in range(3)],
+    [3 * i + (2 - j) for i in range(3) for j in range(3)],
+    [3 * (2 - i) + j for i in range(3) for j in range(3)],
+    [3 * j + i for i in range(3) for j in range(3)],
+    [3 * (2 - j) + (2 - i) for i in range(3) for j in range(3)],
+]
+
+# Image of every 9-bit mask under each symmetry
+SYMMETRY_TABLES = [
+    [sum(1 << symmetry[k] for k in range(9) if mask >> k & 1)
+     for mask in range(FULL + 1)]
+    for symmetry in SYMMETRIES
+]
+
+# Values of positions already searched, keyed by canonical form
+transpositions = {}
+
+# Opening book: one byte per board, indexed by the board read as a base-3
+# number (0 empty, 1 X, 2 O per square), holding the best square or NO_MOVE
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NO_MOVE = 255
+TERNARY = [sum(3 ** k for k in range(9) if mask >> k & 1)
+           for mask in range(FULL + 1)]
+book = None
 
 
 def initial_state():
@@ -24,47 +63,30 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    x_count = 0
-    o_count = 0
-    next_player = None
-    # No next player if the board is in a terminal state
-    if not terminal(board):
-        # Enumerating numbers of each player
-        for row in board:
-            for square in row:
-                if square == O:
-                    o_count += 1
-                elif square == X:
-                    x_count += 1
-        # Decide who players are based on counts
-        if x_count > o_count:
-            next_player = O
-        else:
-            next_player = X
-    return next_player
+    x, o = bitboard(board)
+    if won(x) or won(o) or x | o == FULL:
+        return None
+    return X if count(x) == count(o) else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    moves = set()
-    if not terminal(board):
-        for row in board:  # Enumerating numbers of each player
-            for square in row:
-                if square is EMPTY:
-                    moves.add((board.index(row), row.index(square)))
-    return moves
+    if terminal(board):
+        return set()
+    return {(i, j) for i, row in enumerate(board)
+            for j, square in enumerate(row) if square is EMPTY}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (r, j) on the board.
     """
-    new_board = deepcopy(board)
     r, c = action
     if (r < 0 or r > 2) or (c < 0 or c > 2):
-        raise
+        raise Exception("invalid action")
+    new_board = [row[:] for row in board]
     new_board[r][c] = player(board)
     return new_board
 
@@ -73,37 +95,20 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    winning_player = None
-    # Check rows
-    for row in board:
-        if row[0] == row[1] == row[2]:
-            winning_player = row[0]
-    # Check cols
-    for col_index in range(3):
-        if board[0][col_index] == board[1][col_index] == board[2][col_index]:
-            winning_player = board[0][col_index]
-    # Check diags
-    if board[0][0] == board[1][1] == board[2][2]:
-        winning_player = board[0][0]
-    elif board[0][2] == board[1][1] == board[2][0]:
-        winning_player = board[0][2]
-    return winning_player
-
-
-def filled(board):
-    empty_count = 0
-    for row in board:
-        for col in row:
-            if col == EMPTY:
-                empty_count += 1
-    return empty_count == 0
+    x, o = bitboard(board)
+    if won(x):
+        return X
+    elif won(o):
+        return O
+    return None
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    return (winner(board) == X or winner(board) == O) or filled(board)
+    x, o = bitboard(board)
+    return won(x) or won(o) or x | o == FULL
 
 
 def utility(board):
@@ -123,39 +128,410 @@ def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
-    global optimal_action
-    optimal = None
-    if not terminal(board):
-        if player(board) == O:
-            minimise(board)
-            optimal = optimal_action
-        elif player(board) == X:
-            maximise(board)
-            optimal = optimal_action
-    return optimal
+    if terminal(board):
+        return None
+    x, o = bitboard(board)
+    square = load_book()[TERNARY[x] + 2 * TERNARY[o]]
+    if square != NO_MOVE:
+        return divmod(square, 3)
+    return search(board)[1]
 
 
-def minimise(board):
-    global optimal_action
-    if terminal(board):
-        return utility(board)
-    v = float("inf")
-    for action in actions(board):
-        temp = v
-        v = min(v, maximise(result(board, action)))
-        if v != temp:
-            optimal_action = action
-    return v
-
-
-def maximise(board):
-    global optimal_action
+def load_book():
+    """
+    Returns the opening book, reading it on first use, or an empty book if
+    the file is missing.
+    """
+    global book
+    if book is None:
+        try:
+            with open(BOOK, "rb") as f:
+                book = f.read()
+        except FileNotFoundError:
+            book = bytes([NO_MOVE]) * 3 ** 9
+    return book
+
+
+def build_book(filename=BOOK):
+    """
+    Solves every reachable position and writes its best move to filename.
+    """
+    table = bytearray([NO_MOVE]) * 3 ** 9
+    pending = [initial_state()]
+    while pending:
+        board = pending.pop()
+        x, o = bitboard(board)
+        index = TERNARY[x] + 2 * TERNARY[o]
+        if terminal(board) or table[index] != NO_MOVE:
+            continue
+        i, j = search(board)[1]
+        table[index] = 3 * i + j
+        pending.extend(result(board, action) for action in actions(board))
+    with open(filename, "wb") as f:
+        f.write(table)
+
+
+def search(board, max_depth=9):
+    """
+    Returns (value, action) for the player to move on the board, where value
+    is the utility reached with best play and action the move to make.
+    Searches no more than max_depth moves ahead, scoring unfinished games
+    as 0. Every search keeps its own state, so it is safe to run several at
+    once from different threads or games.
+    """
     if terminal(board):
-        return utility(board)
-    v = float("-inf")
-    for action in actions(board):
-        temp = v
-        v = max(v, minimise(result(board, action)))
-        if v != temp:
-            optimal_action = action
-    return v
+        return utility(board), None
+    x, o = bitboard(board)
+    return Search().run(x, o, max_depth)
+
+
+class Search():
+    """
+    Negamax with alpha-beta pruning and iterative deepening, trying the
+    previous iteration's best move and then killer moves first.
+    """
+
+    def __init__(self):
+        self.killers = [None] * 10
+        self.nodes = 0
+
+    def run(self, x, o, max_depth):
+        """
+        Returns (value, action) for the player to move, deepening one move
+        at a time until the result no longer depends on the depth limit.
+        """
+        to_move = 1 if count(x) == count(o) else -1
+        empty = 9 - count(x | o)
+        square = None
+        for depth in range(1, min(max_depth, empty) + 1):
+            v, square, exact = self.negamax(x, o, to_move, depth, -2, 2, 0,
+                                            square)
+
+            # Wins and losses are never heuristic, so they are final too
+            if exact or v != 0:
+                break
+        return to_move * v, divmod(square, 3)
+
+    def negamax(self, x, o, to_move, depth, alpha, beta, ply, first=None):
+        """
+        Returns the value of a position for the player to move (1 for X, -1
+        for O), the best square, and whether the value is exact rather than
+        cut short by the depth limit.
+        """
+        self.nodes += 1
+        key = canonical(x, o)
+        if ply > 0 and key in transpositions:
+            return to_move * transpositions[key], None, True
+        if won(x) or won(o):
+            transpositions[key] = 1 if won(x) else -1
+            return to_move * transpositions[key], None, True
+        if x | o == FULL:
+            transpositions[key] = 0
+            return 0, None, True
+        if depth == 0:
+            return 0, None, False
+
+        # Try the suggested move, then this ply's killer, then the rest
+        moves = [square for square in range(9) if not (x | o) >> square & 1]
+        for hint in (self.killers[ply], first):
+            if hint in moves:
+                moves.remove(hint)
+                moves.insert(0, hint)
+
+        original_alpha = alpha
+        best, best_square, exact = -2, None, True
+        for square in moves:
+            bit = 1 << square
+            if to_move == 1:
+                child = (x | bit, o)
+            else:
+                child = (x, o | bit)
+            v, _, child_exact = self.negamax(*child, -to_move, depth - 1,
+                                             -beta, -alpha, ply + 1)
+            v = -v
+            exact = exact and child_exact
+            if v > best:
+                best, best_square = v, square
+            alpha = max(alpha, v)
+            if best == 1 or alpha >= beta:
+                self.killers[ply] = square
+                break
+
+        # Only values inside the window are exact enough to share
+        if exact and original_alpha < best < beta:
+            transpositions[key] = to_move * best
+        return best, best_square, exact
+
+
+def bitboard(board):
+    """
+    Returns the masks of the squares held by X and by O.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, square in enumerate(row):
+            if square == X:
+                x |= 1 << (3 * i + j)
+            elif square == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def won(mask):
+    """
+    Returns True if the squares in mask include a full line.
+    """
+    return any(mask & line == line for line in WIN_MASKS)
+
+
+def count(mask):
+    """
+    Returns the number of squares in mask.
+    """
+    return bin(mask).count("1")
+
+
+def canonical(x, o):
+    """
+    Returns one key shared by a position and all its symmetric copies.
+    """
+    return min(table[x] | table[o] << 9 for table in SYMMETRY_TABLES)
+
+
+class MNKGame():
+    """
+    Game on a board of rows x cols squares, won by the first player to get k
+    in a row in any direction: MNKGame(3, 3, 3) is tictactoe and
+    MNKGame(15, 15, 5) is gomoku. Squares are numbered i * cols + j.
+
+    Each move only revisits the lines through its square, both to detect a
+    win and to update the heuristic score.
+    """
+
+    # Row and column steps along each line direction
+    DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = [EMPTY] * (rows * cols)
+        self.history = []
+        self.winner = None
+
+        # Every window of k squares in a line, and the windows of each square
+        self.windows = []
+        self.square_windows = [[] for _ in self.cells]
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in self.DIRECTIONS:
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        for step in range(k):
+                            square = (i + step * di) * cols + (j + step * dj)
+                            self.square_windows[square].append(
+                                len(self.windows)
+                            )
+                        self.windows.append((i, j, di, dj))
+
+        # Marks of each player in every window, and the score they give X
+        self.marks = {X: [0] * len(self.windows), O: [0] * len(self.windows)}
+        self.score = 0
+
+    @classmethod
+    def from_board(cls, board, k=3):
+        """
+        Returns the game for a list-of-lists board such as initial_state().
+        """
+        game = cls(len(board), len(board[0]), k)
+        for i, row in enumerate(board):
+            for j, square in enumerate(row):
+                if square is not EMPTY:
+                    game.place(i * game.cols + j, square)
+        return game
+
+    def player(self):
+        """
+        Returns the player whose turn it is.
+        """
+        return X if len(self.history) % 2 == 0 else O
+
+    def terminal(self):
+        """
+        Returns True if the game is over.
+        """
+        return self.winner is not None or len(self.history) == len(self.cells)
+
+    def play(self, square):
+        """
+        Places the current player's mark on square.
+        """
+        if self.cells[square] is not EMPTY or self.winner is not None:
+            raise Exception("invalid action")
+        self.place(square, self.player())
+
+    def place(self, square, mark):
+        """
+        Puts mark on square, updating the windows through it and the winner.
+        """
+        self.rescore(square, mark, 1)
+        self.cells[square] = mark
+        self.history.append(square)
+        if any(self.marks[mark][w] == self.k
+               for w in self.square_windows[square]):
+            self.winner = mark
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        square = self.history.pop()
+        self.rescore(square, self.cells[square], -1)
+        self.cells[square] = EMPTY
+        self.winner = None
+
+    def rescore(self, square, mark, change):
+        """
+        Adds change to mark's count in every window through square.
+        """
+        x_marks, o_marks = self.marks[X], self.marks[O]
+        counts = self.marks[mark]
+        for w in self.square_windows[square]:
+            self.score -= window_score(x_marks[w], o_marks[w])
+            counts[w] += change
+            self.score += window_score(x_marks[w], o_marks[w])
+
+    def moves(self):
+        """
+        Returns the empty squares worth searching: all of them on small
+        boards, otherwise those next to a mark already played.
+        """
+        empty = [s for s, cell in enumerate(self.cells) if cell is EMPTY]
+        if not self.history:
+            return [(self.rows // 2) * self.cols + self.cols // 2]
+        if len(self.cells) <= 25:
+            return empty
+        nearby = set()
+        for square in self.history:
+            i, j = divmod(square, self.cols)
+            for r in range(max(i - 1, 0), min(i + 2, self.rows)):
+                for c in range(max(j - 1, 0), min(j + 2, self.cols)):
+                    nearby.add(r * self.cols + c)
+        return [square for square in empty if square in nearby]
+
+    def evaluate(self):
+        """
+        Returns the heuristic score for the player to move.
+        """
+        return self.score if self.player() == X else -self.score
+
+
+def window_score(x_marks, o_marks):
+    """
+    Returns what a window of k squares is worth to X: 10 ** marks if only
+    X has marks in it, minus that if only O has, and nothing otherwise.
+    """
+    if x_marks and o_marks:
+        return 0
+    if x_marks:
+        return 10 ** x_marks
+    if o_marks:
+        return -10 ** o_marks
+    return 0
+
+
+# Scores beyond any heuristic value, for won and lost games
+WIN = 10 ** 12
+
+
+class TimeUp(Exception):
+    pass
+
+
+class MNKSearch():
+    """
+    Depth-limited negamax with alpha-beta pruning over an MNKGame, deepening
+    iteratively until the depth or time budget runs out.
+    """
+
+    def __init__(self, game, max_depth=4, time_limit=1.0):
+        self.game = game
+        self.max_depth = max_depth
+        self.deadline = None
+        self.time_limit = time_limit
+        self.killers = {}
+        self.nodes = 0
+
+    def run(self):
+        """
+        Returns (value, action) for the player to move, from the deepest
+        search that finished in time. The first depth always finishes.
+        """
+        start = time.perf_counter()
+        best = None
+        for depth in range(1, self.max_depth + 1):
+            if depth > 1:
+                self.deadline = start + self.time_limit
+            try:
+                best = self.negamax(depth, -WIN - 1, WIN + 1, 0,
+                                    best and best[1])
+            except TimeUp:
+                break
+            if abs(best[0]) >= WIN - len(self.game.cells):
+                break
+        value, square = best
+        return value, divmod(square, self.game.cols)
+
+    def negamax(self, depth, alpha, beta, ply, first=None):
+        """
+        Returns the value of the game for the player to move and the best
+        square, searching depth moves ahead.
+        """
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TimeUp()
+        game = self.game
+
+        # The previous player just moved, so only they can have won
+        if game.winner is not None:
+            return ply - WIN, None
+        if game.terminal():
+            return 0, None
+        if depth == 0:
+            return game.evaluate(), None
+
+        moves = game.moves()
+        for hint in (self.killers.get(ply), first):
+            if hint in moves:
+                moves.remove(hint)
+                moves.insert(0, hint)
+
+        best, best_square = -WIN - 1, None
+        for square in moves:
+            game.play(square)
+            try:
+                v = -self.negamax(depth - 1, -beta, -alpha, ply + 1)[0]
+            finally:
+                game.undo()
+            if v > best:
+                best, best_square = v, square
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                self.killers[ply] = square
+                break
+        return best, best_square
+
+
+def mnk_search(game, max_depth=4, time_limit=1.0):
+    """
+    Returns (value, action) for the player to move in an MNKGame, where
+    value is a heuristic score for that player (beyond +-WIN / 2 for a
+    forced result) and action is the (i, j) to play.
+    """
+    if game.terminal():
+        return 0, None
+    return MNKSearch(game, max_depth, time_limit).run()
+
+
+if __name__ == "__main__":
+    build_book()
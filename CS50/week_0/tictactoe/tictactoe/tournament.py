@@ -0,0 +1,125 @@
+"""
+Headless self-play tournament for the Tic Tac Toe AI.
+
+Plays AI-vs-AI, AI-vs-random and random-vs-AI games across a process pool
+and reports games per second, nodes searched per AI move, the latency of
+AI moves and how each matchup ended.
+
+Usage: python tournament.py [--games N] [--workers N] [--no-book] [--cold]
+                            [--seed N]
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tictactoe as ttt
+
+# Who plays X and who plays O in each matchup
+MATCHUPS = [("ai", "ai"), ("ai", "random"), ("random", "ai")]
+
+# Games handed to a worker at a time
+BATCH = 50
+
+
+def ai_move(board, use_book, cold):
+    """
+    Returns the AI's action on the board and the number of nodes searched
+    to find it, which is 0 for a move read from the opening book.
+    """
+    x, o = ttt.bitboard(board)
+    if use_book:
+        square = ttt.load_book()[ttt.TERNARY[x] + 2 * ttt.TERNARY[o]]
+        if square != ttt.NO_MOVE:
+            return divmod(square, 3), 0
+    if cold:
+        ttt.transpositions.clear()
+    search = ttt.Search()
+    action = search.run(x, o, 9)[1]
+    return action, search.nodes
+
+
+def play_games(matchup, seed, games, use_book, cold):
+    """
+    Plays games of one matchup and returns (outcomes, moves), where
+    outcomes counts wins for X, wins for O and draws, and moves lists
+    (nodes, seconds) for every move the AI made.
+    """
+    rng = random.Random(seed)
+    outcomes = {ttt.X: 0, ttt.O: 0, None: 0}
+    moves = []
+    for _ in range(games):
+        board = ttt.initial_state()
+        while not ttt.terminal(board):
+            if matchup[0 if ttt.player(board) == ttt.X else 1] == "ai":
+                start = time.perf_counter()
+                action, nodes = ai_move(board, use_book, cold)
+                moves.append((nodes, time.perf_counter() - start))
+            else:
+                action = rng.choice(sorted(ttt.actions(board)))
+            board = ttt.result(board, action)
+        outcomes[ttt.winner(board)] += 1
+    return outcomes, moves
+
+
+def percentile(values, fraction):
+    """Returns the value below which fraction of the sorted values fall."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(matchup, outcomes, moves, seconds):
+    """Prints the results of one matchup."""
+    games = sum(outcomes.values())
+    print(f"{matchup[0]} (X) vs {matchup[1]} (O): {games} games in "
+          f"{seconds:.2f}s, {games / seconds:.0f} games/sec")
+    print(f"  X wins {outcomes[ttt.X]}, O wins {outcomes[ttt.O]}, "
+          f"draws {outcomes[None]}")
+    if not moves:
+        return
+    nodes = sorted(n for n, _ in moves)
+    latencies = sorted(s * 1e6 for _, s in moves)
+    print(f"  nodes/move: mean {sum(nodes) / len(nodes):.1f}, "
+          f"max {nodes[-1]}")
+    print("  latency (us): " + ", ".join(
+        f"p{int(100 * fraction)} {percentile(latencies, fraction):.0f}"
+        for fraction in (0.5, 0.9, 0.99)
+    ) + f", max {latencies[-1]:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=3000,
+                        help="games played per matchup")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--no-book", action="store_true",
+                        help="search every move instead of using the book")
+    parser.add_argument("--cold", action="store_true",
+                        help="clear the transposition table before searches")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        for number, matchup in enumerate(MATCHUPS):
+            sizes = [min(BATCH, args.games - start)
+                     for start in range(0, args.games, BATCH)]
+            start = time.perf_counter()
+            futures = [
+                pool.submit(play_games, matchup,
+                            args.seed * 1000003 + number * 10007 + batch,
+                            size, not args.no_book, args.cold)
+                for batch, size in enumerate(sizes)
+            ]
+            outcomes = {ttt.X: 0, ttt.O: 0, None: 0}
+            moves = []
+            for future in futures:
+                batch_outcomes, batch_moves = future.result()
+                for outcome, games in batch_outcomes.items():
+                    outcomes[outcome] += games
+                moves.extend(batch_moves)
+            report(matchup, outcomes, moves, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Propositional logic engine shared by the week 1 puzzles.
+
+Sentences are built from Symbol, Not, And, Or, Implication and
+Biconditional, and model_check decides entailment by compiled model
+enumeration, a process pool or a CDCL SAT solver.
+"""
+
+from .counting import count_models, probability
+from .inference import (
+    KnowledgeBase, model_check, model_check_many, parallel_search
+)
+from .normalform import (
+    SizeLimitExceeded, cnf, dnf, is_false, is_literal, is_true, nnf,
+    propagate, simplify
+)
+from .sat import CNF, Solver
+from .sentences import (
+    And, Biconditional, EvaluationException, Implication, Not, Or, Sentence,
+    Symbol
+)
@@ -0,0 +1,69 @@
+"""
+Times entailment on the week 1 puzzles with each model_check backend.
+
+Usage: python -m logic.benchmark [repeats]
+"""
+
+import contextlib
+import io
+import os
+import runpy
+import sys
+import time
+
+from . import Symbol, model_check, model_check_many
+
+BACKENDS = ["enumerate", "cdcl"]
+
+# Puzzle script, relative to week_1, and the knowledge bases it defines
+PUZZLES = [
+    ("clue", os.path.join("src", "clue.py"), ["knowledge"]),
+    ("mastermind", os.path.join("src", "mastermind.py"), ["knowledge"]),
+    ("knights", os.path.join("knights", "puzzle.py"),
+     ["knowledge0", "knowledge1", "knowledge2", "knowledge3"]),
+]
+
+
+def load(path):
+    """Runs a puzzle script quietly and returns its globals."""
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return runpy.run_path(os.path.join(directory, path),
+                              run_name="benchmark")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'puzzle':<12}{'symbols':>8}{'method':>12}{'seconds':>10}")
+    for name, path, knowledge_bases in PUZZLES:
+        variables = load(path)
+        knowledge_bases = [variables[kb] for kb in knowledge_bases]
+        symbols = len(set().union(*[kb.symbols() for kb in knowledge_bases]))
+
+        # Ask every knowledge base about each of its symbols
+        timings = {}
+        for backend in BACKENDS:
+            timings[backend] = best_time(repeats, lambda: [
+                model_check(kb, Symbol(symbol), backend=backend)
+                for kb in knowledge_bases for symbol in kb.symbols()
+            ])
+        timings["batch"] = best_time(repeats, lambda: [
+            model_check_many(kb, [Symbol(symbol) for symbol in kb.symbols()])
+            for kb in knowledge_bases
+        ])
+        for method, seconds in timings.items():
+            print(f"{name:<12}{symbols:>8}{method:>12}{seconds:>10.4f}")
+
+
+def best_time(repeats, function):
+    """Returns the fastest of several timed calls to function."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    main()
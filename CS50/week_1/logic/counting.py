@@ -0,0 +1,128 @@
+from .sat import CNF
+
+
+class Clauses():
+    """Stands in for a Solver to collect clauses as they are encoded."""
+
+    def __init__(self):
+        self.num_variables = 0
+        self.clauses = []
+
+    def new_variable(self):
+        self.num_variables += 1
+        return self.num_variables
+
+    def add_clause(self, literals):
+        self.clauses.append(frozenset(literals))
+
+
+def count_models(knowledge, query=None):
+    """
+    Returns the number of models over the symbols of knowledge (and query)
+    in which knowledge (and query, if given) is true.
+    """
+    encoding = CNF(Clauses())
+    encoding.add(knowledge)
+    clauses = encoding.solver.clauses
+    if query is not None:
+        clauses = clauses + [frozenset([encoding.literal(query)])]
+    return count_clauses(frozenset(clauses), encoding.solver.num_variables)
+
+
+def probability(query, knowledge):
+    """
+    Returns the probability that query is true given knowledge, taking
+    every model of knowledge to be equally likely.
+    """
+    encoding = CNF(Clauses())
+    encoding.add(knowledge)
+    literal = encoding.literal(query)
+    clauses = frozenset(encoding.solver.clauses)
+    n = encoding.solver.num_variables
+
+    # Both counts share one cache, since most components recur in both
+    cache = {}
+    total = count_clauses(clauses, n, cache)
+    if total == 0:
+        raise ValueError("knowledge base has no models")
+    return count_clauses(clauses | {frozenset([literal])}, n, cache) / total
+
+
+def count_clauses(clauses, n, cache=None):
+    """
+    Returns the number of assignments to variables 1 to n that satisfy
+    every clause in a frozenset of frozenset clauses.
+
+    Tseitin auxiliary variables are fixed by the symbols they encode, so
+    counting over them gives the count over the symbols alone.
+    """
+    cache = {} if cache is None else cache
+    free = n - len(set().union(*[map(abs, clause) for clause in clauses]))
+    return count_component(clauses, cache) * 2 ** free
+
+
+def count_component(clauses, cache):
+    """Counts the models of clauses over exactly the variables they use."""
+    if not clauses:
+        return 1
+    if frozenset() in clauses:
+        return 0
+    if clauses in cache:
+        return cache[clauses]
+
+    # Clauses sharing no variables are counted independently
+    components = split_components(clauses)
+    if len(components) > 1:
+        result = 1
+        for component in components:
+            result *= count_component(component, cache)
+            if result == 0:
+                break
+        cache[clauses] = result
+        return result
+
+    # Branch on a unit literal if there is one, else the busiest variable
+    occurrences = {}
+    for clause in clauses:
+        for literal in clause:
+            occurrences[abs(literal)] = occurrences.get(abs(literal), 0) + 1
+        if len(clause) == 1:
+            break
+    if len(clause) == 1:
+        variable = abs(next(iter(clause)))
+    else:
+        variable = max(occurrences, key=occurrences.get)
+
+    # Variables that drop out of the clauses under a branch are free there
+    result = 0
+    remaining = len(set().union(*[map(abs, clause) for clause in clauses]))
+    for literal in (variable, -variable):
+        reduced = frozenset(clause - {-literal} for clause in clauses
+                            if literal not in clause)
+        if frozenset() in reduced:
+            continue
+        used = len(set().union(*[map(abs, clause) for clause in reduced]))
+        result += count_component(reduced, cache) * 2 ** (remaining - 1 - used)
+    cache[clauses] = result
+    return result
+
+
+def split_components(clauses):
+    """Splits clauses into groups that share no variables."""
+    parents = {}
+
+    def find(v):
+        while parents.setdefault(v, v) != v:
+            parents[v] = parents[parents[v]]
+            v = parents[v]
+        return v
+
+    for clause in clauses:
+        first, *rest = [abs(literal) for literal in clause]
+        for v in rest:
+            parents[find(v)] = find(first)
+    components = {}
+    for clause in clauses:
+        root = find(abs(next(iter(clause))))
+        components.setdefault(root, set()).add(clause)
+    return [frozenset(component) for component in components.values()]
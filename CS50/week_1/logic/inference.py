@@ -0,0 +1,264 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .normalform import is_false, propagate, simplify
+from .sat import CNF
+from .sentences import And, Not, Symbol
+
+
+class KnowledgeBase(And):
+    """
+    Conjunction that keeps its satisfying models between queries.
+
+    Models are bitmasks over self.index, extended as new symbols appear.
+    Adding a conjunct only filters the models already found, and answers to
+    queries are cached until the next conjunct could change them.
+    """
+
+    def __init__(self, *conjuncts):
+        super().__init__()
+        self.index = {}
+        self.models = [0]
+        self.answers = {}
+        self.always = self.sometimes = 0
+        for conjunct in conjuncts:
+            self.add(conjunct)
+
+    def add(self, conjunct):
+        super().add(conjunct)
+
+        # Give any new symbols the next free bits, then keep only the
+        # models (over old and new symbols) where the conjunct holds
+        base = len(self.index)
+        for name in sorted(conjunct.symbols() - self.index.keys()):
+            self.index[name] = len(self.index)
+        holds = predicate(conjunct, self.index)
+        self.models = list(filter(holds, (
+            model | (extra << base)
+            for model in self.models
+            for extra in range(2 ** (len(self.index) - base))
+        )))
+
+        # Bits set in every model, and in at least one model
+        self.always = self.models[0] if self.models else 0
+        self.sometimes = 0
+        for model in self.models:
+            self.always &= model
+            self.sometimes |= model
+
+        # Fewer models can only make more queries entailed
+        self.answers = {query: answer
+                        for query, answer in self.answers.items() if answer}
+
+    def entails(self, query):
+        """Checks if knowledge base entails query."""
+        if query not in self.answers:
+            self.answers[query] = self.check(query)
+        return self.answers[query]
+
+    def check(self, query):
+        """Checks query against every stored model."""
+        if not self.models:
+            return True
+
+        # Literals over known symbols are answered from the bit summaries
+        if isinstance(query, Symbol) and query.name in self.index:
+            return bool(self.always >> self.index[query.name] & 1)
+        if (isinstance(query, Not) and isinstance(query.operand, Symbol)
+                and query.operand.name in self.index):
+            return not self.sometimes >> self.index[query.operand.name] & 1
+
+        # Symbols only in the query can take either value in every model
+        index = dict(self.index)
+        for name in sorted(query.symbols() - self.index.keys()):
+            index[name] = len(index)
+        holds = predicate(query, index)
+        base = len(self.index)
+        return all(map(holds, (
+            model | (extra << base)
+            for model in self.models
+            for extra in range(2 ** (len(index) - base))
+        )))
+
+
+def model_check(knowledge, query, backend="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    backend is "enumerate" to try every model, "parallel" to try them across
+    a process pool (see parallel_search), or "cdcl" to search for a
+    counter-model with the SAT solver. Sentences nested too deeply to
+    compile are checked one model at a time instead:
+
+    >>> from logic import Implication, Or
+    >>> a, b = Symbol("a"), Symbol("b")
+    >>> query = a
+    >>> for i in range(200):
+    ...     query = Implication([a, b][i % 2], query)
+    >>> model_check(And(Or(a, b)), query)
+    True
+    """
+    if backend == "cdcl":
+        cnf = CNF()
+        cnf.add(knowledge)
+        return cnf.entails(query)
+    elif backend not in ("enumerate", "parallel"):
+        raise ValueError(f"unknown backend {backend}")
+
+    # Fix the symbols the knowledge base forces, so they are not enumerated
+    known, knowledge = propagate(knowledge)
+    if is_false(knowledge):
+        return True
+    query = simplify(query, known)
+
+    # Number every symbol in both knowledge and query, so that a model is
+    # just a bitmask with bit i set when symbol i is true
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    # A counter-model is one where knowledge is true but query is false
+    counter = (f"lambda m: {knowledge.source(index)} "
+               f"and not {query.source(index)}")
+
+    # Check that no model is a counter-model, in this process if the
+    # counter-model source could not be compiled for worker processes
+    holds, fails = evaluator(knowledge, index), evaluator(query, index)
+    fallback = lambda m: holds(m) and not fails(m)
+    check = compile_predicate(counter, fallback)
+    if backend == "parallel" and check is not fallback:
+        return not parallel_search(counter, len(symbols))
+    return not any(map(check, range(2 ** len(symbols))))
+
+
+def predicate(sentence, index):
+    """Returns a function checking sentence in bitmask models over index."""
+    return compile_predicate(f"lambda m: {sentence.source(index)}",
+                             evaluator(sentence, index))
+
+
+def compile_predicate(source, fallback):
+    """
+    Compiles source, a lambda over a bitmask model, returning fallback
+    instead if it is nested too deeply for Python's parser.
+    """
+    try:
+        return eval(source)
+    except (MemoryError, RecursionError, SyntaxError):
+        return fallback
+
+
+def evaluator(sentence, index):
+    """
+    Returns a function checking sentence in bitmask models over index by
+    walking the sentence, which is slower than compiled source but works at
+    any depth.
+    """
+    bits = list(index.items())
+    return lambda m: sentence.evaluate({name: m >> i & 1 for name, i in bits})
+
+
+# Below this many symbols, parallel_search is not worth starting a pool for
+PARALLEL_MIN_SYMBOLS = 20
+
+# Predicate and stop flag of a parallel_search worker process
+worker_predicate = None
+worker_found = None
+
+
+def parallel_search(source, n, workers=None):
+    """
+    Checks if the predicate compiled from source (a lambda over a bitmask)
+    holds for any of the 2 ** n models.
+
+    The models are split into sub-cubes by fixing their top bits, and the
+    sub-cubes are searched across a process pool. Each worker compiles the
+    predicate once when it starts, and every worker stops as soon as any of
+    them finds a model. On platforms that spawn rather than fork, callers
+    must be guarded by `if __name__ == "__main__"`.
+    """
+    if n < PARALLEL_MIN_SYMBOLS:
+        return any(map(eval(source), range(2 ** n)))
+
+    # Fix enough top bits to give each worker several sub-cubes
+    workers = workers or os.cpu_count()
+    fixed = min(n, (4 * workers - 1).bit_length())
+    size = 2 ** (n - fixed)
+
+    found = multiprocessing.Event()
+    with ProcessPoolExecutor(workers, initializer=start_worker,
+                             initargs=(source, found)) as executor:
+        futures = [executor.submit(search_cube, cube * size, (cube + 1) * size)
+                   for cube in range(2 ** fixed)]
+        for future in as_completed(futures):
+            if future.result():
+                found.set()
+                for other in futures:
+                    other.cancel()
+                return True
+    return False
+
+
+def start_worker(source, found):
+    """Compiles the predicate of a parallel_search worker process."""
+    global worker_predicate, worker_found
+    worker_predicate = eval(source)
+    worker_found = found
+
+
+def search_cube(start, stop, step=2 ** 16):
+    """Checks models start to stop - 1, giving up once any worker succeeds."""
+    for low in range(start, stop, step):
+        if worker_found.is_set():
+            return False
+        if any(map(worker_predicate, range(low, min(low + step, stop)))):
+            return True
+    return False
+
+
+def model_check_many(knowledge, queries):
+    """
+    Checks many queries against a knowledge base in one sweep of its models.
+
+    Returns three lists: the queries entailed by the knowledge base, the
+    queries whose negation it entails, and the queries it leaves open.
+    """
+    queries = list(queries)
+
+    # Fix the symbols the knowledge base forces, so they are not enumerated
+    known, knowledge = propagate(knowledge)
+    if is_false(knowledge):
+        return queries, [], []
+    simplified = [simplify(query, known) for query in queries]
+
+    symbols = sorted(knowledge.symbols().union(
+        *[query.symbols() for query in simplified]
+    ))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    # Fold every query's truth value in a model into one bitmask
+    holds = predicate(knowledge, index)
+    checks = [evaluator(query, index) for query in simplified]
+    truths = compile_predicate("lambda m: 0" + "".join(
+        f" | ({1 << i} if {query.source(index)} else 0)"
+        for i, query in enumerate(simplified)
+    ), lambda m: sum(1 << i for i, check in enumerate(checks) if check(m)))
+
+    # Track which queries are true in every model, and in at least one
+    every = 2 ** len(queries) - 1
+    always, sometimes = every, 0
+    for truth in map(truths, filter(holds, range(2 ** len(symbols)))):
+        always &= truth
+        sometimes |= truth
+        if not always and sometimes == every:
+            break
+
+    entailed, refuted, unknown = [], [], []
+    for i, query in enumerate(queries):
+        if always >> i & 1:
+            entailed.append(query)
+        elif not sometimes >> i & 1:
+            refuted.append(query)
+        else:
+            unknown.append(query)
+    return entailed, refuted, unknown
@@ -0,0 +1,197 @@
+from .sentences import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class SizeLimitExceeded(Exception):
+    pass
+
+
+def is_true(sentence):
+    """Checks if sentence is the constant true, an empty conjunction."""
+    return isinstance(sentence, And) and not sentence.conjuncts
+
+
+def is_false(sentence):
+    """Checks if sentence is the constant false, an empty disjunction."""
+    return isinstance(sentence, Or) and not sentence.disjuncts
+
+
+def is_literal(sentence):
+    """Checks if sentence is a symbol or a negated symbol."""
+    return isinstance(sentence, Symbol) or (
+        isinstance(sentence, Not) and isinstance(sentence.operand, Symbol)
+    )
+
+
+def negate(sentence):
+    """Returns the negation of sentence, folding constants and double Nots."""
+    if is_true(sentence):
+        return Or()
+    if is_false(sentence):
+        return And()
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return Not(sentence)
+
+
+def conjoin(sentences):
+    """Returns the flattened conjunction of already simplified sentences."""
+    conjuncts = {}
+    for sentence in sentences:
+        for conjunct in (sentence.conjuncts if isinstance(sentence, And)
+                         else [sentence]):
+            if is_false(conjunct) or negate(conjunct) in conjuncts:
+                return Or()
+            conjuncts[conjunct] = True
+    if len(conjuncts) == 1:
+        return next(iter(conjuncts))
+    return And(*conjuncts)
+
+
+def disjoin(sentences):
+    """Returns the flattened disjunction of already simplified sentences."""
+    disjuncts = {}
+    for sentence in sentences:
+        for disjunct in (sentence.disjuncts if isinstance(sentence, Or)
+                         else [sentence]):
+            if is_true(disjunct) or negate(disjunct) in disjuncts:
+                return And()
+            disjuncts[disjunct] = True
+    if len(disjuncts) == 1:
+        return next(iter(disjuncts))
+    return Or(*disjuncts)
+
+
+def simplify(sentence, known=None):
+    """
+    Returns a sentence equivalent to sentence once the symbols in known, a
+    dict from symbol name to truth value, are fixed.
+
+    Constants are folded (And() is true and Or() is false), nested
+    conjunctions and disjunctions are flattened, and double negations and
+    repeated or complementary operands are removed.
+    """
+    known = known or {}
+    if isinstance(sentence, Symbol):
+        if sentence.name in known:
+            return And() if known[sentence.name] else Or()
+        return sentence
+    elif isinstance(sentence, Not):
+        return negate(simplify(sentence.operand, known))
+    elif isinstance(sentence, And):
+        return conjoin([simplify(conjunct, known)
+                        for conjunct in sentence.conjuncts])
+    elif isinstance(sentence, Or):
+        return disjoin([simplify(disjunct, known)
+                        for disjunct in sentence.disjuncts])
+    elif isinstance(sentence, Implication):
+        antecedent = simplify(sentence.antecedent, known)
+        consequent = simplify(sentence.consequent, known)
+        if is_false(antecedent) or is_true(consequent):
+            return And()
+        if is_true(antecedent) or is_false(consequent):
+            return disjoin([negate(antecedent), consequent])
+        return Implication(antecedent, consequent)
+    elif isinstance(sentence, Biconditional):
+        left = simplify(sentence.left, known)
+        right = simplify(sentence.right, known)
+        if is_true(left) or is_true(right):
+            return right if is_true(left) else left
+        if is_false(left) or is_false(right):
+            return negate(right if is_false(left) else left)
+        if left == right:
+            return And()
+        return Biconditional(left, right)
+    raise Exception("nothing to simplify")
+
+
+def propagate(knowledge, known=None):
+    """
+    Fixes every symbol forced by a literal conjunct of knowledge.
+
+    Returns a dict of the forced truth values, extending known, and the rest
+    of knowledge simplified under them, which is Or() if knowledge is
+    contradictory.
+    """
+    known = dict(known or {})
+    while True:
+        knowledge = simplify(knowledge, known)
+        conjuncts = (knowledge.conjuncts if isinstance(knowledge, And)
+                     else [knowledge])
+        units = [conjunct for conjunct in conjuncts if is_literal(conjunct)]
+        if not units:
+            return known, knowledge
+        for unit in units:
+            if isinstance(unit, Symbol):
+                known[unit.name] = True
+            else:
+                known[unit.operand.name] = False
+
+
+def nnf(sentence, positive=True):
+    """
+    Returns sentence (or its negation, if not positive) in negation normal
+    form: conjunctions and disjunctions of symbols and negated symbols.
+    """
+    if isinstance(sentence, Symbol):
+        return sentence if positive else Not(sentence)
+    elif isinstance(sentence, Not):
+        return nnf(sentence.operand, not positive)
+    elif isinstance(sentence, And):
+        parts = [nnf(conjunct, positive) for conjunct in sentence.conjuncts]
+        return conjoin(parts) if positive else disjoin(parts)
+    elif isinstance(sentence, Or):
+        parts = [nnf(disjunct, positive) for disjunct in sentence.disjuncts]
+        return disjoin(parts) if positive else conjoin(parts)
+    elif isinstance(sentence, Implication):
+        return nnf(Or(Not(sentence.antecedent), sentence.consequent),
+                   positive)
+    elif isinstance(sentence, Biconditional):
+        left, right = sentence.left, sentence.right
+        if positive:
+            return nnf(And(Or(Not(left), right), Or(left, Not(right))))
+        return nnf(And(Or(left, right), Or(Not(left), Not(right))))
+    raise Exception("nothing to convert")
+
+
+def distribute(sentence, outer, limit):
+    """
+    Returns the normal form of an NNF sentence as a list of tuples of
+    literals: the outer connective (And for CNF, Or for DNF) over the inner
+    one. Raises SizeLimitExceeded past limit tuples.
+    """
+    if isinstance(sentence, outer):
+        operands = sentence.conjuncts if outer is And else sentence.disjuncts
+        groups = []
+        for operand in operands:
+            groups.extend(distribute(operand, outer, limit))
+            if limit is not None and len(groups) > limit:
+                raise SizeLimitExceeded(f"more than {limit} clauses")
+        return groups
+    if is_literal(sentence):
+        return [(sentence,)]
+
+    # Distribute the inner connective over every operand's groups
+    operands = sentence.disjuncts if outer is And else sentence.conjuncts
+    groups = [()]
+    for operand in operands:
+        groups = [
+            group + tuple(part for part in other if part not in group)
+            for group in groups
+            for other in distribute(operand, outer, limit)
+            if not any(negate(part) in group for part in other)
+        ]
+        if limit is not None and len(groups) > limit:
+            raise SizeLimitExceeded(f"more than {limit} clauses")
+    return groups
+
+
+def cnf(sentence, limit=None):
+    """Returns sentence in conjunctive normal form: an And of Ors."""
+    return And(*[Or(*clause)
+                 for clause in distribute(nnf(sentence), And, limit)])
+
+
+def dnf(sentence, limit=None):
+    """Returns sentence in disjunctive normal form: an Or of Ands."""
+    return Or(*[And(*term)
+                for term in distribute(nnf(sentence), Or, limit)])
@@ -0,0 +1,318 @@
+import heapq
+
+from .sentences import And, Or
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver.
+
+    Variables are numbered from 1 and literals are non-zero integers, with
+    -v standing for the negation of v. Propagation uses two watched literals
+    per clause, branching follows VSIDS activity with phase saving, and the
+    search restarts on the Luby sequence.
+    """
+
+    restart_interval = 100
+    activity_decay = 0.95
+
+    def __init__(self):
+        self.num_variables = 0
+        self.clauses = []
+        self.watches = {}
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.heap = []
+        self.unsatisfiable = False
+        self.model = None
+
+    def new_variable(self):
+        """Adds a new variable and returns it."""
+        self.num_variables += 1
+        v = self.num_variables
+        self.watches[v] = []
+        self.watches[-v] = []
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        heapq.heappush(self.heap, (0.0, v))
+        return v
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        if literal > 0:
+            return self.values[literal]
+        return -self.values[-literal]
+
+    def add_clause(self, literals):
+        """Adds a clause, given as an iterable of literals."""
+        self.backtrack(0)
+        literals = set(literals)
+        clause = []
+        for literal in literals:
+            if -literal in literals or self.value(literal) == 1:
+                return
+            if self.value(literal) == 0:
+                clause.append(literal)
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        """Stores a clause and watches its first two literals."""
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(len(self.clauses) - 1)
+        self.watches[clause[1]].append(len(self.clauses) - 1)
+        return len(self.clauses) - 1
+
+    def enqueue(self, literal, reason):
+        """Assigns literal true at the current decision level."""
+        v = abs(literal)
+        self.values[v] = 1 if literal > 0 else -1
+        self.levels[v] = len(self.trail_limits)
+        self.reasons[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Runs unit propagation, returning a conflicting clause or None."""
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches[false_literal]
+            self.watches[false_literal] = kept = []
+            for i, c in enumerate(watchers):
+                clause = self.clauses[c]
+
+                # Keep the falsified watch in second position
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(c)
+                    continue
+
+                # Look for a replacement watch that is not false
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(c)
+                        break
+                else:
+                    kept.append(c)
+                    if self.value(clause[0]) == -1:
+                        kept.extend(watchers[i + 1:])
+                        return c
+                    self.enqueue(clause[0], c)
+        return None
+
+    def analyze(self, conflict):
+        """Returns a first-UIP learnt clause and the level to backtrack to."""
+        level = len(self.trail_limits)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in (clause if literal is None else clause[1:]):
+                v = abs(q)
+                if v not in seen and self.levels[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.levels[v] == level:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+
+            # Walk back along the trail to the next literal involved
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+        learnt[0] = -literal
+
+        # Watch the literal with the highest level after the asserting one
+        if len(learnt) == 1:
+            return learnt, 0
+        k = max(range(1, len(learnt)),
+                key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, v):
+        """Increases the VSIDS activity of a variable."""
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[u], u)
+                         for u in range(1, self.num_variables + 1)
+                         if self.values[u] == 0]
+            heapq.heapify(self.heap)
+        elif self.values[v] == 0:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def backtrack(self, level):
+        """Undoes all assignments above the given decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.phases[v] = literal > 0
+            self.values[v] = 0
+            self.reasons[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with highest activity, or None."""
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if self.values[v] == 0:
+                return v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every assumption
+        literal true, storing a satisfying model in self.model.
+        """
+        self.model = None
+        if self.unsatisfiable:
+            return False
+        restarts = 0
+        conflicts = 0
+        limit = self.restart_interval * luby(restarts)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+                conflicts += 1
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                self.increment /= self.activity_decay
+                continue
+
+            # Restart once the conflict budget for this run is spent
+            if conflicts >= limit:
+                self.backtrack(0)
+                restarts += 1
+                conflicts = 0
+                limit = self.restart_interval * luby(restarts)
+                continue
+
+            # Assumptions are decided first, one per decision level
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                if self.value(literal) == -1:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if self.value(literal) == 0:
+                    self.enqueue(literal, None)
+                continue
+
+            v = self.decide()
+            if v is None:
+                self.model = [value == 1 for value in self.values]
+                self.backtrack(0)
+                return True
+            self.trail_limits.append(len(self.trail))
+            self.enqueue(v if self.phases[v] else -v, None)
+
+
+def luby(i):
+    """Returns the i-th term (from 0) of the Luby restart sequence."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i %= size
+    return 2 ** exponent
+
+
+class CNF():
+    """Tseitin encoding of sentences into the clauses of a Solver."""
+
+    def __init__(self, solver=None):
+        self.solver = solver or Solver()
+        self.variables = {}
+        self.literals = {}
+        self.true = None
+
+    def variable(self, name):
+        """Returns the solver variable for a symbol name."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_variable()
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new auxiliary variable."""
+        return self.solver.new_variable()
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to a sentence, encoding it once."""
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.encode(self)
+        return self.literals[sentence]
+
+    def conjunction(self, literals):
+        """Returns a literal equivalent to the conjunction of literals."""
+        if len(literals) == 1:
+            return literals[0]
+        if not literals:
+            if self.true is None:
+                self.true = self.fresh()
+                self.solver.add_clause([self.true])
+            return self.true
+        x = self.fresh()
+        for literal in literals:
+            self.solver.add_clause([-x, literal])
+        self.solver.add_clause([x] + [-literal for literal in literals])
+        return x
+
+    def add(self, sentence):
+        """Asserts that a sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.solver.add_clause([self.literal(disjunct)
+                                    for disjunct in sentence.disjuncts])
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+    def entails(self, query):
+        """Checks if the asserted sentences entail query."""
+        return not self.solver.solve([-self.literal(query)])
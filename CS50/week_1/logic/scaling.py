@@ -0,0 +1,178 @@
+"""
+Scaling benchmark for entailment on generated puzzles.
+
+Builds Mastermind, Clue and knights-and-knaves knowledge bases of growing
+size and records, per model_check backend, the time and peak memory of
+asking about every symbol. A backend stops growing once its mean query
+time passes the budget, and the enumerating backends skip knowledge bases
+with more symbols than they could ever finish.
+
+Usage: python -m logic.scaling [--sizes 2 3 4] [--backends enumerate cdcl]
+                               [--budget SECONDS] [--max-symbols N]
+                               [--output FILE.csv|.json]
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from . import And, Implication, Not, Or, Symbol, model_check
+
+FIELDS = ["family", "size", "symbols", "backend", "queries",
+          "mean_seconds", "max_seconds", "peak_bytes"]
+
+
+def mastermind(n, seed=0):
+    """Mastermind with n colours in n positions and a few hints."""
+    rng = random.Random(seed)
+    secret = list(range(n))
+    rng.shuffle(secret)
+
+    def placed(colour, position):
+        return Symbol(f"colour{colour}_{position}")
+
+    knowledge = And()
+    for colour in range(n):
+        knowledge.add(Or(*[placed(colour, i) for i in range(n)]))
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    knowledge.add(Implication(placed(colour, i),
+                                              Not(placed(colour, j))))
+                    knowledge.add(Implication(placed(i, colour),
+                                              Not(placed(j, colour))))
+
+    # Reveal one colour and rule out a wrong colour at every position
+    knowledge.add(placed(secret[0], 0))
+    for position in range(1, n):
+        wrong = rng.choice([c for c in range(n) if c != secret[position]])
+        knowledge.add(Not(placed(wrong, position)))
+    return knowledge
+
+
+def clue(n, seed=0):
+    """Clue with n cards split between people, rooms and weapons."""
+    rng = random.Random(seed)
+    cards = [Symbol(f"card{i}") for i in range(n)]
+    categories = [cards[i::3] for i in range(3)]
+    knowledge = And(*[Or(*category) for category in categories if category])
+
+    # The player holds about half of the cards outside the solution
+    solution = [rng.choice(category) for category in categories if category]
+    for card in cards:
+        if card not in solution and rng.random() < 0.5:
+            knowledge.add(Not(card))
+    return knowledge
+
+
+def knights(n, seed=0):
+    """Knights and knaves where each of n speakers talks about another."""
+    rng = random.Random(seed)
+    knight = [Symbol(f"{i} is a Knight") for i in range(n)]
+    knave = [Symbol(f"{i} is a Knave") for i in range(n)]
+    knowledge = And()
+    for i in range(n):
+        knowledge.add(Or(knight[i], knave[i]))
+        knowledge.add(Not(And(knight[i], knave[i])))
+
+        # Speaker i makes a claim about someone else (or themselves)
+        j, k = rng.randrange(n), rng.randrange(n)
+        statement = rng.choice([
+            knave[j],
+            knight[j],
+            Or(And(knight[j], knight[k]), And(knave[j], knave[k])),
+        ])
+        knowledge.add(Implication(knight[i], statement))
+        knowledge.add(Implication(knave[i], Not(statement)))
+    return knowledge
+
+
+FAMILIES = {"mastermind": mastermind, "clue": clue, "knights": knights}
+
+# Backends whose cost is exponential in the number of symbols
+ENUMERATING = {"enumerate", "parallel"}
+
+
+def measure(knowledge, backend):
+    """Asks about every symbol, returning per-query times and peak memory."""
+    queries = [Symbol(name) for name in sorted(knowledge.symbols())]
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        model_check(knowledge, query, backend=backend)
+        times.append(time.perf_counter() - start)
+
+    # Memory is traced in a second pass so it does not skew the timings
+    tracemalloc.start()
+    for query in queries:
+        model_check(knowledge, query, backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak
+
+
+def run(families, sizes, backends, budget, max_symbols):
+    """Returns one result row per family, size and backend measured."""
+    rows = []
+    for family in families:
+        for backend in backends:
+            for size in sizes:
+                knowledge = FAMILIES[family](size)
+                if (backend in ENUMERATING
+                        and len(knowledge.symbols()) > max_symbols):
+                    break
+                times, peak = measure(knowledge, backend)
+                row = {
+                    "family": family,
+                    "size": size,
+                    "symbols": len(knowledge.symbols()),
+                    "backend": backend,
+                    "queries": len(times),
+                    "mean_seconds": sum(times) / len(times),
+                    "max_seconds": max(times),
+                    "peak_bytes": peak,
+                }
+                rows.append(row)
+                print(" ".join(f"{field}={row[field]}" for field in FIELDS),
+                      file=sys.stderr)
+                if row["mean_seconds"] > budget:
+                    break
+    return rows
+
+
+def write(rows, filename):
+    """Writes result rows as CSV or JSON, chosen by file extension."""
+    with open(filename, "w", newline="") as f:
+        if filename.endswith(".json"):
+            json.dump(rows, f, indent=2)
+        else:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--families", nargs="+", default=list(FAMILIES),
+                        choices=list(FAMILIES))
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=[2, 3, 4, 5, 6, 8, 10, 12])
+    parser.add_argument("--backends", nargs="+",
+                        default=["enumerate", "cdcl"])
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="mean seconds per query before a backend stops")
+    parser.add_argument("--max-symbols", type=int, default=24,
+                        help="most symbols an enumerating backend is given")
+    parser.add_argument("--output", default="scaling.csv")
+    args = parser.parse_args()
+    rows = run(args.families, sorted(args.sizes), args.backends,
+               args.budget, args.max_symbols)
+    write(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import weakref
+
+
+class EvaluationException(Exception):
+    pass
+
+
+class Sentence():
+
+    # Every Sentence except And is interned: building a sentence equal to a
+    # live one returns that same object, so equality is identity and each
+    # node computes its hash and symbols once
+    interned = weakref.WeakValueDictionary()
+
+    @classmethod
+    def intern(cls, *operands):
+        """Returns the shared sentence of this class with given operands."""
+
+        # A conjunction can still grow, so it is keyed by identity: two equal
+        # conjunctions must not share a parent that later sees only one of
+        # them change. The shared sentence keeps the conjunction alive, so
+        # its id is not reused while the key is in the table.
+        key = (cls, *[
+            (And, id(operand)) if isinstance(operand, And) else operand
+            for operand in operands
+        ])
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            sentence.operands = operands
+            sentence.setup(*operands)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    def __reduce__(self):
+        return (type(self), self.operands)
+
+    def evaluate(self, model):
+        """Evaluates the logical sentence."""
+        raise Exception("nothing to evaluate")
+
+    def formula(self):
+        """Returns string formula representing logical sentence."""
+        return ""
+
+    def source(self, index):
+        """Returns Python expression evaluating the sentence on bitmask `m`."""
+        raise Exception("nothing to compile")
+
+    def encode(self, cnf):
+        """Returns a CNF literal equivalent to the sentence (Tseitin)."""
+        raise Exception("nothing to encode")
+
+    def symbols(self):
+        """Returns a set of all symbols in the logical sentence."""
+        return frozenset()
+
+    @classmethod
+    def validate(cls, sentence):
+        if not isinstance(sentence, Sentence):
+            raise TypeError("must be a logical sentence")
+
+    @classmethod
+    def parenthesize(cls, s):
+        """Parenthesizes an expression if not already parenthesized."""
+        def balanced(s):
+            """Checks if a string has balanced parentheses."""
+            count = 0
+            for c in s:
+                if c == "(":
+                    count += 1
+                elif c == ")":
+                    if count <= 0:
+                        return False
+                    count -= 1
+            return count == 0
+        if not len(s) or s.isalpha() or (
+            s[0] == "(" and s[-1] == ")" and balanced(s[1:-1])
+        ):
+            return s
+        else:
+            return f"({s})"
+
+
+class Symbol(Sentence):
+
+    def __new__(cls, name):
+        return cls.intern(name)
+
+    def setup(self, name):
+        self.name = name
+        self.hash = hash(("symbol", name))
+        self.names = frozenset([name])
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return self.name
+
+    def evaluate(self, model):
+        try:
+            return bool(model[self.name])
+        except KeyError:
+            raise EvaluationException(f"variable {self.name} not in model")
+
+    def formula(self):
+        return self.name
+
+    def source(self, index):
+        return f"(m & {1 << index[self.name]})"
+
+    def encode(self, cnf):
+        return cnf.variable(self.name)
+
+    def symbols(self):
+        return self.names
+
+
+class Not(Sentence):
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern(operand)
+
+    def setup(self, operand):
+        self.operand = operand
+        self.hash = hash(("not", hash(operand)))
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return f"Not({self.operand})"
+
+    def evaluate(self, model):
+        return not self.operand.evaluate(model)
+
+    def formula(self):
+        return "¬" + Sentence.parenthesize(self.operand.formula())
+
+    def source(self, index):
+        return f"(not {self.operand.source(index)})"
+
+    def encode(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def symbols(self):
+        return self.operand.symbols()
+
+
+class And(Sentence):
+    """
+    Conjunction of sentences.
+
+    And can grow through add, so unlike the other sentences it is not
+    interned. Its symbols are kept up to date as conjuncts are added, but
+    a conjunction should not be added to once it is inside another sentence.
+    Sentences built around equal conjunctions stay separate, so growing
+    one conjunction never changes a sentence built around the other:
+
+    >>> a, b, c = Symbol("a"), Symbol("b"), Symbol("c")
+    >>> x, y = And(a, b), And(a, b)
+    >>> n1, n2 = Not(x), Not(y)
+    >>> x.add(c)
+    >>> n2.formula()
+    '¬(a ∧ b)'
+    >>> n1 is n2, Not(x) is n1
+    (False, True)
+    """
+
+    def __init__(self, *conjuncts):
+        for conjunct in conjuncts:
+            Sentence.validate(conjunct)
+        self.conjuncts = list(conjuncts)
+        self.names = frozenset().union(
+            *[conjunct.symbols() for conjunct in conjuncts]
+        )
+        self.hash = None
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, And)
+                                 and hash(self) == hash(other)
+                                 and self.conjuncts == other.conjuncts)
+
+    def __hash__(self):
+        if self.hash is None:
+            self.hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self.hash
+
+    def __reduce__(self):
+        return (type(self), tuple(self.conjuncts))
+
+    def __repr__(self):
+        conjunctions = ", ".join(
+            [str(conjunct) for conjunct in self.conjuncts]
+        )
+        return f"And({conjunctions})"
+
+    def add(self, conjunct):
+        Sentence.validate(conjunct)
+        self.conjuncts.append(conjunct)
+        if not conjunct.symbols() <= self.names:
+            self.names = self.names | conjunct.symbols()
+        self.hash = None
+
+    def evaluate(self, model):
+        return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
+
+    def formula(self):
+        if len(self.conjuncts) == 1:
+            return self.conjuncts[0].formula()
+        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
+                           for conjunct in self.conjuncts])
+
+    def source(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join([conjunct.source(index)
+                                   for conjunct in self.conjuncts]) + ")"
+
+    def encode(self, cnf):
+        return cnf.conjunction([cnf.literal(conjunct)
+                                for conjunct in self.conjuncts])
+
+    def symbols(self):
+        return self.names
+
+
+class Or(Sentence):
+    def __new__(cls, *disjuncts):
+        for disjunct in disjuncts:
+            Sentence.validate(disjunct)
+        return cls.intern(*disjuncts)
+
+    def setup(self, *disjuncts):
+        self.disjuncts = disjuncts
+        self.hash = hash(
+            ("or", tuple(hash(disjunct) for disjunct in disjuncts))
+        )
+        self.names = frozenset().union(
+            *[disjunct.symbols() for disjunct in disjuncts]
+        )
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
+        return f"Or({disjuncts})"
+
+    def evaluate(self, model):
+        return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
+
+    def formula(self):
+        if len(self.disjuncts) == 1:
+            return self.disjuncts[0].formula()
+        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
+                            for disjunct in self.disjuncts])
+
+    def source(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join([disjunct.source(index)
+                                  for disjunct in self.disjuncts]) + ")"
+
+    def encode(self, cnf):
+        return -cnf.conjunction([-cnf.literal(disjunct)
+                                 for disjunct in self.disjuncts])
+
+    def symbols(self):
+        return self.names
+
+
+class Implication(Sentence):
+    def __new__(cls, antecedent, consequent):
+        Sentence.validate(antecedent)
+        Sentence.validate(consequent)
+        return cls.intern(antecedent, consequent)
+
+    def setup(self, antecedent, consequent):
+        self.antecedent = antecedent
+        self.consequent = consequent
+        self.hash = hash(("implies", hash(antecedent), hash(consequent)))
+        self.names = antecedent.symbols() | consequent.symbols()
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return f"Implication({self.antecedent}, {self.consequent})"
+
+    def evaluate(self, model):
+        return ((not self.antecedent.evaluate(model))
+                or self.consequent.evaluate(model))
+
+    def formula(self):
+        antecedent = Sentence.parenthesize(self.antecedent.formula())
+        consequent = Sentence.parenthesize(self.consequent.formula())
+        return f"{antecedent} => {consequent}"
+
+    def source(self, index):
+        antecedent = self.antecedent.source(index)
+        consequent = self.consequent.source(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def encode(self, cnf):
+        return -cnf.conjunction([cnf.literal(self.antecedent),
+                                 -cnf.literal(self.consequent)])
+
+    def symbols(self):
+        return self.names
+
+
+class Biconditional(Sentence):
+    def __new__(cls, left, right):
+        Sentence.validate(left)
+        Sentence.validate(right)
+        return cls.intern(left, right)
+
+    def setup(self, left, right):
+        self.left = left
+        self.right = right
+        self.hash = hash(("biconditional", hash(left), hash(right)))
+        self.names = left.symbols() | right.symbols()
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return f"Biconditional({self.left}, {self.right})"
+
+    def evaluate(self, model):
+        return ((self.left.evaluate(model)
+                 and self.right.evaluate(model))
+                or (not self.left.evaluate(model)
+                    and not self.right.evaluate(model)))
+
+    def formula(self):
+        left = Sentence.parenthesize(str(self.left))
+        right = Sentence.parenthesize(str(self.right))
+        return f"{left} <=> {right}"
+
+    def source(self, index):
+        left = self.left.source(index)
+        right = self.right.source(index)
+        return f"((not {left}) == (not {right}))"
+
+    def encode(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        x = cnf.fresh()
+        cnf.solver.add_clause([-x, -left, right])
+        cnf.solver.add_clause([-x, left, -right])
+        cnf.solver.add_clause([x, left, right])
+        cnf.solver.add_clause([x, -left, -right])
+        return x
+
+    def symbols(self):
+        return self.names
@@ -1,6 +1,9 @@
+import collections
 import copy
 import itertools
+import math
 import random
+from fractions import Fraction
 
 
 class Minesweeper():
@@ -137,11 +140,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None):
 
-        # Set initial height and width
+        # Set initial height and width, and the number of mines if known
         self.height = height
         self.width = width
+        self.total_mines = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -150,26 +154,121 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, by id. Sentences that
+        # become empty or duplicate another are dropped.
+        self.knowledge = {}
+        self.ids = itertools.count()
+
+        # Id of the sentence with each (cells, count), and ids of the
+        # sentences mentioning each cell
+        self.keys = {}
+        self.sentences_with = collections.defaultdict(set)
+
+        # Ids of sentences changed since inference last looked at them
+        self.pending = collections.deque()
+
+        # Mine placements counted for each group of sentences, see
+        # count_configurations, kept while the group is unchanged
+        self.configurations = {}
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
+        if cell in self.mines:
+            return
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        for i in self.sentences_with.pop(cell, ()):
+            self.update(i, lambda sentence: sentence.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if cell in self.safes:
+            return
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        for i in self.sentences_with.pop(cell, ()):
+            self.update(i, lambda sentence: sentence.mark_safe(cell))
+
+    def key(self, sentence):
+        """
+        Returns what identifies a sentence, for spotting duplicates.
+        """
+        return frozenset(sentence.cells), sentence.count
+
+    def add_sentence(self, cells, count):
+        """
+        Adds a sentence to the knowledge base, unless it is empty or
+        already known, and queues it for inference.
+        """
+        cells = set(cells) - self.safes
+        count -= len(cells & self.mines)
+        cells -= self.mines
+        sentence = Sentence(cells, count)
+        if not cells or self.key(sentence) in self.keys:
+            return
+        i = next(self.ids)
+        self.knowledge[i] = sentence
+        self.keys[self.key(sentence)] = i
+        for cell in cells:
+            self.sentences_with[cell].add(i)
+        self.pending.append(i)
+
+    def update(self, i, change):
+        """
+        Applies change to sentence i, a cell of which has just been marked,
+        then drops it if it is now empty or a duplicate, or else queues it
+        for inference.
+        """
+        sentence = self.knowledge[i]
+        del self.keys[self.key(sentence)]
+        change(sentence)
+        key = self.key(sentence)
+        if not sentence.cells or key in self.keys:
+            del self.knowledge[i]
+            for cell in sentence.cells:
+                self.sentences_with[cell].discard(i)
+        else:
+            self.keys[key] = i
+            self.pending.append(i)
+
+    def infer(self):
+        """
+        Draws conclusions from the sentences that changed, until there
+        are none left: marks the cells of sentences that decide them, and
+        adds the difference whenever one sentence's cells are a subset of
+        another's.
+        """
+        while self.pending:
+            i = self.pending.popleft()
+            if i not in self.knowledge:
+                continue
+            sentence = self.knowledge[i]
+
+            # Cells of a sentence that decides them all
+            known = sentence.known_safes() or sentence.known_mines()
+            if known:
+                mark = self.mark_safe if sentence.count == 0 else self.mark_mine
+                for cell in known:
+                    mark(cell)
+                continue
+
+            # Only sentences sharing a cell can be subsets or supersets
+            related = set()
+            for cell in sentence.cells:
+                related |= self.sentences_with[cell]
+            related.discard(i)
+            for j in related:
+                other = self.knowledge[j]
+                if other.cells < sentence.cells:
+                    self.add_sentence(sentence.cells - other.cells,
+                                      sentence.count - other.count)
+                elif sentence.cells < other.cells:
+                    self.add_sentence(other.cells - sentence.cells,
+                                      other.count - sentence.count)
 
     def get_neighbours(self, cell):
         """
@@ -219,42 +318,10 @@ class MinesweeperAI():
         neighbours = self.get_neighbours(cell)
         num_mines, neighbours = self.get_count_and_remove_mines(neighbours)
         count -= num_mines
-        updated_sentence = Sentence(neighbours, count)
-        if updated_sentence not in self.knowledge:  # we don't want to add a sentence that already exists
-            self.knowledge.append(updated_sentence)
-        # 4) mark any additional cells as safe or as mines if it can be concluded based on the AI's knowledge base
-        for sentence in self.knowledge:
-            safes = sentence.known_safes()
-            mines = sentence.known_mines()
-            for safe in safes:
-                self.mark_safe(safe)  # marking known safes as safe in MineSweeperAI
-            for mine in mines:
-                self.mark_mine(mine)
-        # 5) add any new sentences to the AI's knowledge base if they can be inferred from existing knowledge
-        sentences = self.knowledge.copy()  # Copy
-        for sentence1 in sentences:
-            sentences.remove(sentence1)
-            for sentence2 in sentences:
-                if len(sentence1.cells) != 0 and len(sentence2.cells) != 0:
-                    if len(sentence1.cells) > len(sentence2.cells):  # sentence 2 is a subset since its shorter that sentence 1
-                        parent_set = sentence1.cells
-                        subset = sentence2.cells
-                        mine_count_diff = sentence1.count - sentence2.count  # checking for whether there are any mines in the subset not in the parent set by comparing the numbers of mines in each
-                    elif len(sentence1.cells) < len(sentence2.cells):
-                        parent_set = sentence2.cells
-                        subset = sentence1.cells
-                        mine_count_diff = sentence2.count - sentence1.count
-                    else:
-                        continue
-                    if subset <= parent_set:  # subset needs to be smaller
-                        diff = parent_set - subset  # get non-overlapping elements (exclusive to the parent set)
-                        if len(diff) == 1:
-                            if mine_count_diff == 0:
-                                self.mark_safe(diff.pop())
-                            elif mine_count_diff == 1:
-                                self.mark_mine(diff.pop())
-                        else:
-                            self.knowledge.append(Sentence(diff, mine_count_diff))
+        self.add_sentence(neighbours, count)
+        # 4) and 5) re-examine only the sentences that changed, marking the cells they decide
+        # and adding sentences inferred from them and the sentences they share cells with
+        self.infer()
 
     def make_safe_move(self):
         """
@@ -275,17 +342,230 @@ class MinesweeperAI():
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Chooses among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        the one least likely to be a mine, picking randomly between ties.
         """
-        moves_to_make = []
-        for r in range(self.height):
-            for c in range(self.width):
-                cell = (r, c)
-                if not(cell in self.moves_made or cell in self.mines):  # we don't want cells that have already been chosen or are mines
-                    moves_to_make.append(cell)
-            if not len(moves_to_make) == 0:  # choose a random move as long as there are still moves that can be made
-                move = moves_to_make[random.randint(0, len(moves_to_make)-1)]  # select a random move form the moves that we can make
-                self.moves_made.add(move)
-                return move
+        probabilities = self.mine_probabilities()
+        if not probabilities:
+            return None
+        lowest = min(probabilities.values())
+        move = random.choice(sorted(
+            cell for cell, probability in probabilities.items()
+            if probability == lowest
+        ))
+        self.moves_made.add(move)
+        return move
+
+    def mine_probabilities(self):
+        """
+        Returns the exact probability that each cell not yet chosen or known
+        to be a mine is a mine, counting every placement of the remaining
+        mines consistent with the knowledge as equally likely.
+
+        Cells in no sentence (outside the frontier) all share one
+        probability. Sentences that share no cells constrain each other
+        only through the total number of mines, so each group of connected
+        sentences is counted on its own.
+        """
+        unknown = [
+            (i, j) for i in range(self.height) for j in range(self.width)
+            if (i, j) not in self.moves_made and (i, j) not in self.mines
+        ]
+        probabilities = {cell: Fraction(0) for cell in unknown if cell in self.safes}
+        if probabilities or not unknown:
+            return probabilities
+
+        # Count placements in each component, reusing unchanged ones
+        components = self.components()
+        configurations = {}
+        for key in components:
+            if key not in self.configurations:
+                self.configurations[key] = count_configurations(key)
+            configurations[key] = self.configurations[key]
+        self.configurations = configurations
+        frontier = set().union(*[cells for cells, _ in itertools.chain(*components)])
+        outside = [cell for cell in unknown if cell not in frontier]
+
+        # Weight of a component having k mines, given how the rest of the
+        # mines can be placed in the other components and outside them
+        if self.total_mines is None:
+
+            # With no mine count, components are independent and cells
+            # outside the frontier are as dense as the frontier on average
+            def weights(others):
+                return lambda k: sum(others.values())
+        else:
+            remaining = self.total_mines - len(self.mines)
+
+            def weights(others):
+                return lambda k: sum(
+                    ways * choose(len(outside), remaining - k - m)
+                    for m, ways in others.items()
+                )
+
+        for key, counts in configurations.items():
+            others = {0: 1}
+            for other in components:
+                if other != key:
+                    others = convolve(others, {
+                        k: ways for k, (ways, _) in configurations[other].items()
+                    })
+            weight = weights(others)
+            total = sum(ways * weight(k) for k, (ways, _) in counts.items())
+            cells = ordered(key)
+            for n, cell in enumerate(cells):
+                probabilities[cell] = Fraction(sum(
+                    mined[n] * weight(k) for k, (_, mined) in counts.items()
+                ), total) if total else Fraction(1, 2)
+
+        # Cells outside the frontier share the mines left over
+        if outside:
+            if self.total_mines is None:
+                if frontier:
+                    density = sum(probabilities[cell] for cell in frontier) / len(frontier)
+                else:
+                    density = Fraction(1, 2)
+            else:
+                everything = {0: 1}
+                for key in components:
+                    everything = convolve(everything, {
+                        k: ways for k, (ways, _) in configurations[key].items()
+                    })
+                total = sum(ways * choose(len(outside), remaining - m)
+                            for m, ways in everything.items())
+                expected = sum(ways * choose(len(outside), remaining - m)
+                               * (remaining - m) for m, ways in everything.items())
+                density = (Fraction(expected, total * len(outside))
+                           if total else Fraction(1, 2))
+            for cell in outside:
+                probabilities[cell] = density
+        return probabilities
+
+    def components(self):
+        """
+        Returns the knowledge split into groups of sentences linked by
+        shared cells, each as a frozenset of (cells, count) pairs.
+        """
+        components = []
+        seen = set()
+        for start in self.knowledge:
+            if start in seen:
+                continue
+            seen.add(start)
+            group = []
+            queue = [start]
+            while queue:
+                i = queue.pop()
+                group.append(self.key(self.knowledge[i]))
+                for cell in self.knowledge[i].cells:
+                    for j in self.sentences_with[cell]:
+                        if j not in seen:
+                            seen.add(j)
+                            queue.append(j)
+            components.append(frozenset(group))
+        return components
+
+
+def ordered(sentences):
+    """
+    Returns the cells of a group of sentences, in the order they are
+    reached by walking from sentence to sentence through shared cells, so
+    that each sentence's cells are close together.
+    """
+    sentences = sorted(sentences, key=lambda sentence: sorted(sentence[0]))
+    cells = []
+    seen = set()
+    placed = set()
+    queue = collections.deque([sentences[0]])
+    seen.add(sentences[0])
+    while queue:
+        sentence = queue.popleft()
+        for cell in sorted(sentence[0] - placed):
+            placed.add(cell)
+            cells.append(cell)
+        for other in sentences:
+            if other not in seen and other[0] & sentence[0]:
+                seen.add(other)
+                queue.append(other)
+    return cells
+
+
+def count_configurations(sentences):
+    """
+    Counts the placements of mines in the cells of a connected group of
+    sentences that satisfy every sentence. Returns a dict from the number
+    of mines placed to (ways, mined), where mined lists, for each cell in
+    ordered(sentences), how many of those ways put a mine there.
+
+    Cells are assigned one at a time, backtracking as soon as a sentence
+    can no longer be satisfied. Once a cell is assigned, the rest of the
+    search depends only on how many mines are still owed to the sentences
+    that are partly assigned, so results are cached on that.
+    """
+    cells = ordered(sentences)
+    position = {cell: n for n, cell in enumerate(cells)}
+    sentences = [
+        (sorted(position[cell] for cell in sentence_cells), count)
+        for sentence_cells, count in sentences
+    ]
+
+    # For each cell, the sentences it is in and how many of their cells
+    # come after it, and the sentences partly assigned before it
+    touching = [[] for _ in cells]
+    for s, (members, _) in enumerate(sentences):
+        for k, n in enumerate(members):
+            touching[n].append((s, len(members) - k - 1))
+    partial = [
+        [s for s, (members, _) in enumerate(sentences)
+         if members[0] < n <= members[-1]]
+        for n in range(len(cells) + 1)
+    ]
+
+    owed = [count for _, count in sentences]
+    cache = {}
+
+    def search(n):
+        key = (n, tuple(owed[s] for s in partial[n]))
+        if key in cache:
+            return cache[key]
+        if n == len(cells):
+            result = {0: (1, [])}
+        else:
+            result = {}
+            for mine in (0, 1):
+                for s, _ in touching[n]:
+                    owed[s] -= mine
+                if all(0 <= owed[s] <= after for s, after in touching[n]):
+                    for k, (ways, mined) in search(n + 1).items():
+                        total, cell_counts = result.get(k + mine, (0, None))
+                        row = [ways * mine] + mined
+                        if cell_counts is not None:
+                            row = [a + b for a, b in zip(cell_counts, row)]
+                        result[k + mine] = (total + ways, row)
+                for s, _ in touching[n]:
+                    owed[s] += mine
+        cache[key] = result
+        return result
+
+    return search(0)
+
+
+def convolve(a, b):
+    """
+    Returns the distribution of the sum of two independent counts, each
+    given as a dict from value to number of ways.
+    """
+    result = {}
+    for x, ways_x in a.items():
+        for y, ways_y in b.items():
+            result[x + y] = result.get(x + y, 0) + ways_x * ways_y
+    return result
+
+
+def choose(n, k):
+    """Returns n choose k, or 0 if k is out of range."""
+    if k < 0 or k > n:
+        return 0
+    return math.comb(n, k)
@@ -1,9 +1,55 @@
+import collections
 import pygame
+import queue
 import sys
+import threading
 import time
 
 from minesweeper import Minesweeper, MinesweeperAI
 
+
+def choose_move(ai):
+    """
+    Returns the AI's next move, or None with the mines it knows of if it
+    has no moves left. Runs on the AI thread.
+    """
+    move = ai.make_safe_move()
+    if move is None:
+        move = ai.make_random_move()
+        if move is None:
+            print("No moves left to make.")
+            return None, ai.mines.copy()
+        else:
+            print("No known safe moves, AI making random move.")
+    else:
+        print("AI making safe move.")
+    return move, None
+
+
+def run_ai(ai, jobs, moves):
+    """
+    Makes the AI's calls from jobs in the order they were sent, until it
+    is sent None, and puts each move it chooses on moves.
+    """
+    for job in iter(jobs.get, None):
+        if job == "move":
+            moves.put(choose_move(ai))
+        else:
+            ai.add_knowledge(*job)
+
+
+def start_ai():
+    """
+    Starts a new AI on a thread of its own, so the board keeps drawing
+    while it thinks, and returns the queues of its jobs and moves.
+    """
+    ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
+    jobs, moves = queue.Queue(), queue.Queue()
+    threading.Thread(target=run_ai, args=(ai, jobs, moves),
+                     daemon=True).start()
+    return jobs, moves
+
+
 HEIGHT = 8
 WIDTH = 8
 MINES = 8
@@ -39,7 +85,8 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+ai_jobs, ai_moves = start_ai()
+ai_thinking = False
 
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
@@ -49,6 +96,10 @@ lost = False
 # Show instructions initially
 instructions = True
 
+# Milliseconds taken by recent frames
+clock = pygame.time.Clock()
+frame_times = collections.deque(maxlen=60)
+
 while True:
 
     # Check if game quit
@@ -56,6 +107,7 @@ while True:
         if event.type == pygame.QUIT:
             sys.exit()
 
+    frame_times.append(clock.tick(60))
     screen.fill(BLACK)
 
     # Show game instructions
@@ -159,8 +211,26 @@ while True:
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
     screen.blit(text, textRect)
 
+    # Show frame times
+    frame = smallFont.render(
+        f"frame {frame_times[-1]} ms, worst {max(frame_times)} ms",
+        True, WHITE
+    )
+    frameRect = frame.get_rect()
+    frameRect.center = ((5 / 6) * width, height - 30)
+    screen.blit(frame, frameRect)
+
     move = None
 
+    # Pick up the AI's move once it has been chosen; it is kept apart from
+    # any click this frame, since the AI already counts it as made
+    ai_move = None
+    if not ai_moves.empty():
+        ai_thinking = False
+        ai_move, mines = ai_moves.get()
+        if ai_move is None:
+            flags = mines
+
     left, _, right = pygame.mouse.get_pressed()
 
     # Check for a right-click to toggle flagging
@@ -178,27 +248,25 @@ while True:
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
+        # If AI button clicked, ask the AI for a move
         if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+            if not ai_thinking:
+                ai_thinking = True
+                ai_jobs.put("move")
             time.sleep(0.2)
 
         # Reset game state
         elif resetButton.collidepoint(mouse):
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
             revealed = set()
             flags = set()
             lost = False
+
+            # The old AI works through what it was already sent on its own
+            # thread, then stops; the new game never waits for it
+            ai_jobs.put(None)
+            ai_jobs, ai_moves = start_ai()
+            ai_thinking = False
             continue
 
         # User-made move
@@ -210,13 +278,15 @@ while True:
                             and (i, j) not in revealed):
                         move = (i, j)
 
-    # Make move and update AI knowledge
-    if move:
+    # Make moves and update AI knowledge
+    for move in [ai_move, move]:
+        if move is None or lost or move in revealed:
+            continue
         if game.is_mine(move):
             lost = True
         else:
             nearby = game.nearby_mines(move)
             revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            ai_jobs.put((move, nearby))
 
     pygame.display.flip()
@@ -51,6 +51,6 @@ knowledge.add(And(
     Not(Symbol("yellow3"))
 ))
 
-for symbol in symbols:
-    if model_check(knowledge, symbol):
-        print(symbol)
+entailed, _, _ = model_check_many(knowledge, symbols)
+for symbol in entailed:
+    print(symbol)